@@ -1,3 +1,5 @@
+# Serve with an ASGI server (e.g. `uvicorn config.asgi:application`) to get the
+# streaming /api/notifications/stream/ endpoint; runserver is WSGI-only.
 import os
 from django.core.asgi import get_asgi_application
 
@@ -1,6 +1,9 @@
 
+import os
 from pathlib import Path
 
+from config.sqlite_profiles import READ_ALIAS, sqlite_databases
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'dev-secret-key'
@@ -30,6 +33,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # staff-only ?_profile=1 / X-Profile: 1 captures (users/middleware.py)
+    'users.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,20 +59,37 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# SQLite connection profile, see config/sqlite_profiles.py ('stock' = Django defaults)
+SQLITE_PROFILE = os.environ.get('XCHANGE_SQLITE_PROFILE', 'wal')
+DATABASES = sqlite_databases(os.environ.get('XCHANGE_DB_PATH', BASE_DIR / 'db.sqlite3'), SQLITE_PROFILE)
+
+# read-only list views read through this alias when it exists (users/db_router.py)
+DATABASE_READ_ALIAS = READ_ALIAS
+DATABASE_ROUTERS = ['users.db_router.ReadReplicaRouter']
 
 AUTH_USER_MODEL = 'users.User'
 
 STATIC_URL = 'static/'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'xchange-default',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+
+# mini-profile embeds (users/profile_cache.py)
+PROFILE_CACHE_ALIAS = 'default'
+PROFILE_CACHE_TIMEOUT = 300  # seconds; entries are also dropped on User save
+
 
 MIDDLEWARE = [
   'corsheaders.middleware.CorsMiddleware',
+  # timings for everything below it (users/middleware.py)
+  'users.middleware.PerformanceMiddleware',
+  # br / gzip for large responses; inside the timer so bytes are wire bytes
+  'users.middleware.CompressionMiddleware',
   # ... keep rest as before
 ] + MIDDLEWARE[1:]
 # or insert cors middleware at the top of existing MIDDLEWARE list
@@ -79,7 +101,66 @@ CORS_ALLOWED_ORIGINS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWTAuthentication + cached user lookup (users/authentication.py)
+        "users.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        # orjson when installed, same bytes as JSONRenderer (users/renderers.py)
+        "users.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
 }
 
+# Authenticated-user cache used by CachedJWTAuthentication
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60  # seconds; bounds staleness across processes
+
+# Real-time notification push (users/realtime.py, users/stream_views.py).
+# Notifications are written by the outbox worker, another process, so streams
+# are fed by polling the table (InMemoryBroker only sees this process's rows).
+NOTIFICATION_BROKER = 'users.realtime.DatabasePollingBroker'
+NOTIFICATION_POLL_INTERVAL = 1.0  # seconds
+NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+
+# In-memory friend graph (users/graph.py): full reload interval in seconds, to
+# pick up friendships written by other processes.
+FRIEND_GRAPH_TTL = 300
+
+# Skill matrix behind /api/users/recommended/ (users/recommend.py): full
+# reload interval in seconds, to pick up users written by other processes.
+SKILL_MATRIX_TTL = 300
+
+# Filtered /api/users/ id lists (users/feed_cache.py)
+FEED_CACHE_SIZE = 512  # distinct filter combinations
+FEED_CACHE_TTL = 60  # seconds; bounds staleness across processes
+
+# Request instrumentation (users/middleware.py, users/metrics.py)
+PERF_SERVER_TIMING = True  # add a Server-Timing header to every response
+PERF_METRICS_SAMPLES = 1024  # recent observations kept per route for p50/p95/p99
+
+# On-demand request profiling (users/profiling.py)
+PROFILE_SAMPLE_RATE = 1.0  # share of flagged staff requests actually profiled
+PROFILE_CAPTURE_DIR = BASE_DIR / 'var' / 'profiles'
+PROFILE_CAPTURE_KEEP = 50  # newest captures kept; older ones are deleted
+
+# Response compression (users.middleware.CompressionMiddleware); Brotli is
+# used when the optional `brotli` package is installed, gzip otherwise
+COMPRESS_MIN_LENGTH = 1024  # bytes; smaller bodies aren't worth it
+COMPRESS_BROTLI_QUALITY = 5  # 0-11; mid levels suit per-request compression
+
+# Bulk signup (users/bulk_signup.py): password-hashing processes used by
+# /api/auth/signup/batch/ (0 hashes in the request thread)
+BULK_SIGNUP_HASH_WORKERS = 4
+
+# Outbox (users/outbox.py): side effects of writes (notifications) are queued
+# as OutboxJob rows and run by `manage.py run_outbox`, next to the web server.
+# OUTBOX_EAGER = True runs them right after the request's commit instead (no
+# worker needed), which is the default while DEBUG is on; a deployment with
+# DEBUG off must run the worker.
+OUTBOX_EAGER = DEBUG
+OUTBOX_BATCH_SIZE = 100  # jobs claimed per round
+OUTBOX_MAX_ATTEMPTS = 8  # then the job is marked failed
+OUTBOX_RETRY_BASE = 2  # seconds; doubles per attempt (jittered)
+OUTBOX_RETRY_MAX = 600  # seconds; cap on the retry delay
+OUTBOX_LEASE = 300  # seconds before a job left running by a dead worker is reclaimed
+OUTBOX_POLL_INTERVAL = 1.0  # seconds the worker sleeps when the queue is empty
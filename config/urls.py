@@ -14,12 +14,22 @@ from users.views import (
     SignupView, MeView, UsersListView,
     SendFriendRequestView, ReceivedFriendRequestsView, SentFriendRequestsView,
     AcceptFriendRequestView, RejectFriendRequestView, CancelFriendRequestView,
-    FriendsListView, NotificationsListView, MarkNotificationReadView
+    FriendsListView, NotificationsListView, MarkNotificationReadView,
+    UnreadNotificationCountView, MarkNotificationsReadView, MarkAllNotificationsReadView,
+    FriendSuggestionsView, MutualFriendsView, RecommendedUsersView,
+    ChatHistoryView, ChatSendView, MetricsView, BatchSignupView, ExportView,
+    BootstrapView,
 )
+from users.stream_views import notification_stream
+from users.admin import profile_capture_list, profile_capture_download
 
 urlpatterns = [
+    # request profiling captures (before admin/ so the admin catch-all doesn't take them)
+    path('admin/profiles/', admin.site.admin_view(profile_capture_list), name='admin-profiles'),
+    path('admin/profiles/<str:name>', admin.site.admin_view(profile_capture_download), name='admin-profile-download'),
     path('admin/', admin.site.urls),
     path('api/auth/signup/', SignupView.as_view(), name='api-signup'),
+    path('api/auth/signup/batch/', BatchSignupView.as_view(), name='api-signup-batch'),
     path('signup/', TemplateView.as_view(template_name='signup.html'), name='signup'),
     path('login/', TemplateView.as_view(template_name='login.html'), name='login'),
     path('home/', TemplateView.as_view(template_name='home.html'), name='home'),
@@ -27,7 +37,9 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/email/', EmailTokenView.as_view(), name='token_obtain_email'),
     path('api/me/', MeView.as_view(), name='api-me'),
+    path('api/bootstrap/', BootstrapView.as_view(), name='api-bootstrap'),
     path('api/users/', UsersListView.as_view(), name='api-users'),
+    path('api/users/recommended/', RecommendedUsersView.as_view(), name='api-users-recommended'),
     path('api/friends/request/', SendFriendRequestView.as_view(), name='friends-send'),
     path('api/friends/requests/received/', ReceivedFriendRequestsView.as_view(), name='friends-received'),
     path('api/friends/requests/sent/', SentFriendRequestsView.as_view(), name='friends-sent'),
@@ -35,10 +47,26 @@ urlpatterns = [
     path('api/friends/request/<int:pk>/reject/', RejectFriendRequestView.as_view(), name='friends-reject'),
     path('api/friends/request/<int:pk>/cancel/', CancelFriendRequestView.as_view(), name='friends-cancel'),
     path('api/friends/', FriendsListView.as_view(), name='friends-list'),
+    path('api/friends/suggestions/', FriendSuggestionsView.as_view(), name='friends-suggestions'),
+    path('api/friends/mutual/', MutualFriendsView.as_view(), name='friends-mutual'),
 
 # notifications
     path('api/notifications/', NotificationsListView.as_view(), name='notifications-list'),
-    path('api/notifications/<int:pk>/mark-read/', MarkNotificationReadView.as_view(), name='notifications-mark-read'),  
+    path('api/notifications/stream/', notification_stream, name='notifications-stream'),
+    path('api/notifications/unread-count/', UnreadNotificationCountView.as_view(), name='notifications-unread-count'),
+    path('api/notifications/<int:pk>/mark-read/', MarkNotificationReadView.as_view(), name='notifications-mark-read'),
+    path('api/notifications/mark-read/', MarkNotificationsReadView.as_view(), name='notifications-mark-many-read'),
+    path('api/notifications/mark-all-read/', MarkAllNotificationsReadView.as_view(), name='notifications-mark-all-read'),
+
+# chat
+    path('api/chat/<int:user_id>/', ChatHistoryView.as_view(), name='chat-history'),
+    path('api/chat/<int:user_id>/send/', ChatSendView.as_view(), name='chat-send'),
+
+# staff data export
+    path('api/export/<str:kind>/', ExportView.as_view(), name='export'),
+
+# instrumentation
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
 
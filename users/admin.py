@@ -35,3 +35,42 @@ if User:
         # if already registered, replace with our admin
         admin.site.unregister(User)
         admin.site.register(User, UserAdmin)
+
+
+# -------------------------
+# Profiling captures (users/profiling.py): /admin/profiles/
+# Wrapped with admin.site.admin_view in config/urls.py, so staff only.
+# -------------------------
+from datetime import datetime
+
+from django.http import FileResponse, Http404, HttpResponse
+from django.template.response import TemplateResponse
+
+from . import profiling
+
+
+def profile_capture_list(request):
+    captures = [
+        {**c, "modified": datetime.fromtimestamp(c["modified"])}
+        for c in profiling.list_captures()
+    ]
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "captures": captures,
+        "capture_dir": profiling.capture_dir(),
+    }
+    return TemplateResponse(request, "admin/profile_captures.html", context)
+
+
+def profile_capture_download(request, name):
+    path = profiling.capture_path(name)
+    if path is None:
+        raise Http404("No such capture")
+    if request.GET.get("format") == "txt":
+        # readable top-functions table instead of the raw pstats file
+        sort = request.GET.get("sort", "cumulative")
+        if sort not in ("cumulative", "tottime", "ncalls"):
+            sort = "cumulative"
+        return HttpResponse(profiling.capture_summary(path, sort=sort), content_type="text/plain; charset=utf-8")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
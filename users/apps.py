@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class UsersConfig(AppConfig):
+    name = 'users'
+
+    def ready(self):
+        from django.core import checks
+
+        # connect model signal handlers
+        from . import fts, signals  # noqa: F401
+        checks.register(fts.check_triggers, checks.Tags.database)
@@ -0,0 +1,96 @@
+# backend/users/authentication.py
+# JWT authentication that skips the per-request User lookup.
+#
+# Access tokens carry a `ver` claim derived from the password hash (see
+# token_version). Authenticated users are kept in a small in-process LRU keyed
+# on user id; a hit whose version matches the token's needs no database
+# round-trip. Entries are dropped when the User is saved or deleted
+# (users/signals.py) and expire after AUTH_USER_CACHE_TTL seconds so writes
+# made by other processes (e.g. deactivation) are picked up.
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+VERSION_CLAIM = 'ver'
+
+
+def token_version(user):
+    # changes whenever the password changes, which invalidates older tokens
+    return user.get_session_auth_hash()[:16]
+
+
+def add_version_claim(token, user):
+    token[VERSION_CLAIM] = token_version(user)
+    return token
+
+
+class UserCache:
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # keys are str: simplejwt stores the user id claim as a string
+        self._data = OrderedDict()  # str(user_id) -> (version, user, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            cached_version, user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[user_id]
+                return None
+            if cached_version != version:
+                return None
+            self._data.move_to_end(user_id)
+            return user
+
+    def put(self, user_id, version, user):
+        user_id = str(user_id)
+        with self._lock:
+            self._data[user_id] = (version, user, time.monotonic() + self.ttl)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        version = validated_token.get(VERSION_CLAIM)
+
+        user = user_cache.get(user_id, version)
+        if user is not None:
+            return user
+
+        user = super().get_user(validated_token)  # loads the row, checks is_active
+        if version is not None and version != token_version(user):
+            raise AuthenticationFailed("Token is no longer valid", code="token_not_valid")
+        user_cache.put(user_id, version, user)
+        return user
@@ -0,0 +1,41 @@
+# backend/users/bulk.py
+# Side effects of rows inserted with bulk_create, which skips the post_save
+# handlers in users/signals.py. Seeding / import code calls these once per
+# chunk (see also users.notifications.notifications_created).
+from django.db import transaction
+
+from . import skill_index
+from .feed_cache import feed_results
+from .graph import friend_graph
+from .recommend import skill_matrix
+
+
+def users_created(users):
+    """Index new users (skill/language tables, recommendation matrix) and drop
+    cached filter results they could belong to."""
+    users = [u for u in users if u.id is not None]
+    if not users:
+        return
+    skill_index.sync_users(users)
+    feed_results.clear()
+    rows = [(u.id, u.skills, u.languages, u.is_active) for u in users]
+
+    def update_matrix():
+        matrix = skill_matrix()
+        for row in rows:
+            matrix.update_user(*row)
+
+    transaction.on_commit(update_matrix)
+
+
+def friendships_created(friendships):
+    pairs = [(f.user1_id, f.user2_id) for f in friendships]
+    if not pairs:
+        return
+
+    def add_edges():
+        graph = friend_graph()
+        for a, b in pairs:
+            graph.add_edge(a, b)
+
+    transaction.on_commit(add_edges)
@@ -0,0 +1,130 @@
+# backend/users/bulk_signup.py
+# Bulk signup shared by the import_users command and BatchSignupView.
+#
+# Rows are validated with the same rules as SignupView (SignupSerializer) but
+# handled a chunk at a time: one IN query checks the chunk's emails, one the
+# usernames, passwords are hashed across a process pool and the users are
+# inserted with a single bulk_create. Input is any iterable of dicts and
+# results are yielded per chunk, so memory stays flat for any file size.
+import secrets
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework.validators import UniqueValidator
+
+from . import bulk
+from .password_pool import hash_passwords
+from .serializers import SignupSerializer
+
+User = get_user_model()
+
+
+class BulkSignupSerializer(SignupSerializer):
+    # email uniqueness is checked for the whole chunk at once (_import_chunk)
+    # instead of one query per row
+
+    def get_fields(self):
+        fields = super().get_fields()
+        email = fields['email']
+        email.validators = [v for v in email.validators if not isinstance(v, UniqueValidator)]
+        return fields
+
+    def validate_email(self, value):
+        return value.lower()
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# -------------------------
+# import
+# -------------------------
+def import_users(rows, chunk_size=500, executor=None):
+    """Create users from an iterable of signup dicts.
+
+    Yields one result per input row, in input order:
+      {"line": n, "id": ..., "email": ...}   created
+      {"line": n, "errors": {...}}           rejected (same shape as SignupView's 400)
+    A row may also be an exception (e.g. a malformed input line); it is
+    reported as an error for that line."""
+    for chunk in chunked(enumerate(rows, 1), chunk_size):
+        yield from _import_chunk(chunk, executor)
+
+
+def _import_chunk(chunk, executor):
+    results = {}
+    valid = []
+    for line, row in chunk:
+        if isinstance(row, Exception):
+            results[line] = {"line": line, "errors": {"non_field_errors": [str(row)]}}
+            continue
+        serializer = BulkSignupSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((line, dict(serializer.validated_data)))
+        else:
+            results[line] = {"line": line, "errors": serializer.errors}
+
+    # one query for the chunk's emails, one for its usernames
+    taken_emails = set(User.objects.filter(email__in={d['email'] for _, d in valid})
+                       .values_list('email', flat=True))
+    wanted_usernames = {d['email'].split('@')[0] for _, d in valid}
+    taken_usernames = set(User.objects.filter(username__in=wanted_usernames)
+                          .values_list('username', flat=True))
+
+    accepted = []
+    for line, data in valid:
+        email = data['email']
+        if email in taken_emails:
+            results[line] = {"line": line, "errors": {"email": ["Email already registered."]}}
+            continue
+        taken_emails.add(email)  # duplicates later in the same chunk
+        username = email.split('@')[0]  # same default as SignupSerializer.create
+        while username in taken_usernames:
+            username = f"{email.split('@')[0]}-{secrets.token_hex(3)}"
+        taken_usernames.add(username)
+        accepted.append((line, username, data))
+
+    hashes = hash_passwords([data.pop('password') for _, _, data in accepted], executor)
+    users = [User(username=username, password=hashed, **data)
+             for (_, username, data), hashed in zip(accepted, hashes)]
+    _insert(users)
+    for (line, _, data), user in zip(accepted, users):
+        if user.pk is not None:
+            results[line] = {"line": line, "id": user.id, "email": user.email}
+        else:
+            results[line] = {"line": line, "errors": {"non_field_errors": ["Could not create user (conflict)."]}}
+    return [results[line] for line, _ in chunk]
+
+
+def _insert(users):
+    """bulk_create the chunk; if a concurrent signup took one of the names in
+    the meantime, fall back to row-by-row saves. Users that could not be
+    created are left without a pk."""
+    if not users:
+        return
+    try:
+        with transaction.atomic():
+            created = User.objects.bulk_create(users)
+            if created and created[0].pk is None:  # backend without RETURNING
+                ids = dict(User.objects.filter(username__in=[u.username for u in created])
+                           .values_list('username', 'id'))
+                for u in created:
+                    u.pk = ids[u.username]
+            bulk.users_created(created)
+        return
+    except IntegrityError:
+        pass
+    for user in users:
+        user.pk = None
+        try:
+            with transaction.atomic():
+                user.save()  # post_save does the indexing
+        except IntegrityError:
+            user.pk = None
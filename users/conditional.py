@@ -0,0 +1,49 @@
+# backend/users/conditional.py
+# ETag / Last-Modified for polled GET endpoints (/api/me/, /api/friends/,
+# friend requests, notifications).
+#
+# A view supplies a cheap version stamp (get_version): row count plus newest
+# created_at / updated_at for list views, read with one aggregate query over
+# the per-user indexes. The ETag is a hash of that stamp, so a client that
+# sends it back in If-None-Match gets 304 Not Modified before the list is
+# loaded or serialized. Responses are marked `private, no-cache`: browsers
+# keep the body and revalidate on every poll.
+#
+# The stamp only covers the rows themselves; an embedded mini-profile edit
+# (friend renames, new avatar) shows up with the next change to the list.
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+def aggregate_stamp(queryset, timestamp_field, **extra):
+    """(stamp, last_modified) from one aggregate over queryset: row count,
+    newest timestamp_field and any extra aggregates passed in."""
+    values = queryset.order_by().aggregate(n=Count('id'), last=Max(timestamp_field), **extra)
+    return tuple(sorted(values.items())), values['last']
+
+
+class ConditionalGetMixin:
+
+    def get_version(self, request):
+        """(stamp, last_modified datetime or None). The stamp can be any
+        repr()-able value that changes whenever the response body would."""
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        stamp, modified = self.get_version(request)
+        raw = repr((type(self).__name__, request.user.pk, stamp)).encode()
+        etag = f'"{hashlib.blake2b(raw, digest_size=12).hexdigest()}"'
+        last_modified = int(modified.timestamp()) if modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,53 @@
+# backend/users/db_router.py
+# Sends the reads of read-only list views to the read connection alias
+# (settings.DATABASE_READ_ALIAS, defined by config/sqlite_profiles.py). With SQLite in WAL mode that is the same file
+# on a separate query_only connection, so list traffic never queues behind
+# the write transaction of the default connection, and it always sees
+# committed data (no replication lag).
+#
+# Views opt in with ReadOnlyDatabaseMixin; everything else, and every write,
+# uses "default". Reads also stay on "default" while it has a transaction
+# open, so code inside atomic() sees its own uncommitted writes.
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+_reading = contextvars.ContextVar('users_read_only_db', default=False)
+
+
+@contextmanager
+def read_only_db():
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = getattr(settings, 'DATABASE_READ_ALIAS', None)
+        if (_reading.get() and alias in settings.DATABASES
+                and not connections['default'].in_atomic_block):
+            return alias
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # both aliases are the same database
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReadOnlyDatabaseMixin:
+    """For views that only read: run the whole request on the read alias."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with read_only_db():
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,95 @@
+# backend/users/export.py
+# Row-streaming export for analytics (ExportView, export_data command).
+#
+# Rows come from values() querysets walked with .iterator(chunk_size=...) in
+# id order and are encoded a batch at a time, so memory use doesn't depend on
+# the table size. Incremental pulls pass the last id they saw (after_id)
+# and/or a timestamp (updated_since), compared with each kind's modification
+# time so edits and read flags are exported again.
+import csv
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Friendship, FriendRequest, Notification
+
+User = get_user_model()
+
+# kind -> (model, exported fields, timestamp used for updated_since)
+EXPORTS = {
+    'users': (User, (
+        'id', 'username', 'email', 'full_name', 'age', 'avatar_url', 'bio', 'skills', 'languages',
+        'is_active', 'is_staff', 'date_joined', 'last_login', 'updated_at',
+    ), 'updated_at'),  # last_login alone doesn't bump updated_at
+    'friendships': (Friendship, ('id', 'user1_id', 'user2_id', 'created_at'), 'created_at'),  # never edited
+    'friend_requests': (FriendRequest, (
+        'id', 'from_user_id', 'to_user_id', 'status', 'created_at', 'updated_at',
+    ), 'updated_at'),
+    'notifications': (Notification, (
+        'id', 'user_id', 'actor_user_id', 'type', 'text', 'data', 'is_read', 'created_at', 'updated_at',
+    ), 'updated_at'),
+}
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def export_queryset(kind, after_id=None, updated_since=None):
+    model, fields, timestamp = EXPORTS[kind]
+    qs = model.objects.order_by('id')
+    if after_id is not None:
+        qs = qs.filter(id__gt=after_id)
+    if updated_since is not None:
+        qs = qs.filter(**{f'{timestamp}__gte': updated_since})
+    return qs.values(*fields)
+
+
+def _json_cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def stream_export(kind, fmt='ndjson', after_id=None, updated_since=None, chunk_size=2000):
+    """Yield the export as text, one chunk_size batch of rows per item."""
+    fields = EXPORTS[kind][1]
+    rows = export_queryset(kind, after_id, updated_since).iterator(chunk_size=chunk_size)
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    n = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow([_json_cell(row[f]) for f in fields])
+        else:
+            buffer.write(encoder.encode(row))
+            buffer.write('\n')
+        n += 1
+        if n % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+
+async def astream(sync_iterable):
+    """Async wrapper for ASGI servers, which would otherwise read a sync
+    streaming body into memory before sending it. Each batch is produced in
+    the same worker thread so the DB cursor stays on its connection."""
+    it = iter(sync_iterable)
+    next_chunk = sync_to_async(lambda: next(it, None), thread_sensitive=True)
+    while True:
+        chunk = await next_chunk()
+        if chunk is None:
+            return
+        yield chunk
@@ -0,0 +1,121 @@
+# backend/users/feed_cache.py
+# Cache of filtered /api/users/ results.
+#
+# Popular filter combinations (?skills=Python&lang=English&age=18-25) are
+# evaluated once and the matching user ids kept in an in-process LRU; pages
+# are then hydrated from the id list. Entries expire after FEED_CACHE_TTL
+# seconds (picks up other processes' writes) and are dropped early when a
+# user's skills / languages / age / is_active change in a way that moves
+# them in or out of that entry's result (post_save, users/signals.py).
+#
+# Free-text ?search= results depend on name/bio ranking and are not cached.
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .skill_index import normalize_tag, normalize_tags
+
+
+def parse_age(value):
+    """'lt18' / '35+' / '18-25' -> inclusive (low, high) bounds, None if unset or invalid."""
+    value = (value or '').strip()
+    if value == 'lt18':
+        return (None, 17)
+    if value == '35+':
+        return (35, None)
+    if '-' in value:
+        low, high = value.split('-', 1)
+        try:
+            return (int(low), int(high))
+        except ValueError:
+            return None
+    return None
+
+
+def filter_key(filters):
+    """Normalized cache key for UsersListView.get_filters(), or None when the
+    combination can't be cached."""
+    if filters.get('search'):
+        return None
+    skills = [x for x in filters.get('skills', '').split(',') if x.strip()]
+    return (
+        parse_age(filters.get('age')),
+        tuple(sorted(normalize_tags(skills))),
+        normalize_tag(filters.get('lang', '')),
+    )
+
+
+def matches(key, skills, languages, age, is_active):
+    """Would a user with these values be in the result for key? Mirrors the
+    queryset built by UsersListView."""
+    if not is_active:
+        return False
+    age_range, terms, lang = key
+    if age_range is not None:
+        low, high = age_range
+        if age is None or (low is not None and age < low) or (high is not None and age > high):
+            return False
+    if terms and not set(terms) & set(normalize_tags(skills)):
+        return False
+    if lang and lang not in normalize_tags(languages):
+        return False
+    return True
+
+
+class FeedResultCache:
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (ids, id set, expires_at)
+        self._lock = threading.Lock()
+        # bumped on every user change, so a result computed while a write
+        # was in flight is not stored
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            ids, _, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return ids
+
+    def put(self, key, ids, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = (ids, frozenset(ids), time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def user_changed(self, user_id, skills, languages, age, is_active):
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key, (_, members, _) in self._data.items()
+                if (user_id in members) != matches(key, skills, languages, age, is_active)
+            ]
+            for key in stale:
+                del self._data[key]
+
+    def user_removed(self, user_id):
+        self.user_changed(user_id, None, None, None, False)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+
+feed_results = FeedResultCache(
+    maxsize=getattr(settings, 'FEED_CACHE_SIZE', 512),
+    ttl=getattr(settings, 'FEED_CACHE_TTL', 60),
+)
@@ -0,0 +1,115 @@
+# backend/users/fts.py
+# DDL for the users_user_fts full-text index (SQLite FTS5 only).
+#
+# The triggers keep the index in step with every INSERT/UPDATE/DELETE on
+# users_user (including bulk_create and queryset.update(), which bypass model
+# signals). SQLite rebuilds a table for most ALTERs and that drops its
+# triggers, so any migration that alters users_user must call
+# install_triggers() again afterwards. check_triggers() (a database system
+# check, run by `check --database` and before the test suite) reports a
+# migrated database that lost them.
+#
+# Kept free of model imports so migrations can use it.
+from django.core import checks
+from django.db import connections
+
+FTS_TABLE = 'users_user_fts'
+
+# skills are stored as a JSON array; index the decoded values
+_SKILLS = "(SELECT group_concat(value, ' ') FROM json_each({row}.skills))"
+
+CREATE_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        full_name, username, bio, skills,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+TRIGGER_NAMES = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+TRIGGER_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON users_user BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, full_name, username, bio, skills)
+        VALUES (new.id, new.full_name, new.username, new.bio, {_SKILLS.format(row='new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON users_user BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF full_name, username, bio, skills ON users_user BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, full_name, username, bio, skills)
+        VALUES (new.id, new.full_name, new.username, new.bio, {_SKILLS.format(row='new')});
+    END
+    """,
+]
+
+REBUILD_SQL = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, full_name, username, bio, skills)
+    SELECT id, full_name, username, bio, {_SKILLS.format(row='users_user')}
+    FROM users_user
+    """,
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def install(schema_editor):
+    """Create the index + triggers and fill it from users_user."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # other backends fall back to the skill-index search
+    schema_editor.execute(CREATE_TABLE_SQL)
+    install_triggers(schema_editor)
+    for sql in REBUILD_SQL:
+        schema_editor.execute(sql)
+
+
+def install_triggers(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in TRIGGER_SQL:
+        schema_editor.execute(sql)
+
+
+def uninstall(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+def check_triggers(app_configs=None, databases=None, **kwargs):
+    """Error for each database that has the index but not all its triggers:
+    writes would no longer reach search."""
+    errors = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT type, name FROM sqlite_master WHERE name = %s OR tbl_name = 'users_user'",
+                           [FTS_TABLE])
+            found = cursor.fetchall()
+        if ('table', FTS_TABLE) not in found:
+            continue  # not migrated yet
+        missing = sorted(set(TRIGGER_NAMES) - {name for kind, name in found if kind == 'trigger'})
+        if missing:
+            errors.append(checks.Error(
+                f"Full-text triggers missing on database '{alias}': {', '.join(missing)}.",
+                hint='A migration rebuilt users_user without calling users.fts.install_triggers() '
+                     'afterwards. Add one that runs users.fts.install() (see 0009_reinstall_user_fts).',
+                id='users.E001',
+            ))
+    return errors
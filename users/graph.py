@@ -0,0 +1,117 @@
+# backend/users/graph.py
+# In-memory friend graph for "people you may know" and mutual-friend counts.
+#
+# Friendship rows are loaded once into an adjacency map {user_id: set(ids)}
+# and then kept current through the post_save/post_delete handlers in
+# users/signals.py, so suggestion / mutual-count lookups never hit SQL.
+# Other processes' writes are picked up by a periodic full reload
+# (settings.FRIEND_GRAPH_TTL seconds).
+import heapq
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .models import Friendship
+
+
+class FriendGraph:
+
+    def __init__(self, ttl=None):
+        self._adj = {}
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self.ttl = ttl
+
+    # -------------------------
+    # loading / incremental updates
+    # -------------------------
+    def load(self):
+        adj = {}
+        rows = Friendship.objects.values_list('user1_id', 'user2_id').order_by().iterator(chunk_size=5000)
+        for a, b in rows:
+            adj.setdefault(a, set()).add(b)
+            adj.setdefault(b, set()).add(a)
+        with self._lock:
+            self._adj = adj
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        stale = (
+            self._loaded_at is None
+            or (self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl)
+        )
+        if stale:
+            self.load()
+
+    def add_edge(self, a, b):
+        with self._lock:
+            if self._loaded_at is None:
+                return  # picked up by the first load
+            self._adj.setdefault(a, set()).add(b)
+            self._adj.setdefault(b, set()).add(a)
+
+    def remove_edge(self, a, b):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for x, y in ((a, b), (b, a)):
+                friends = self._adj.get(x)
+                if friends is not None:
+                    friends.discard(y)
+                    if not friends:
+                        del self._adj[x]
+
+    # -------------------------
+    # queries
+    # -------------------------
+    def friends(self, user_id):
+        self._ensure_loaded()
+        with self._lock:
+            return frozenset(self._adj.get(user_id, ()))
+
+    def mutual_count(self, a, b):
+        self._ensure_loaded()
+        with self._lock:
+            return self._mutual(a, b)
+
+    def mutual_counts(self, user_id, others):
+        self._ensure_loaded()
+        with self._lock:
+            return {o: self._mutual(user_id, o) for o in others}
+
+    def _mutual(self, a, b):
+        fa, fb = self._adj.get(a), self._adj.get(b)
+        if not fa or not fb:
+            return 0
+        return len(fa & fb)  # CPython walks the smaller set
+
+    def suggestions(self, user_id, limit=10, exclude=()):
+        """Friends-of-friends ranked by number of mutual friends.
+
+        Returns [(candidate_id, mutual_count), ...]."""
+        self._ensure_loaded()
+        with self._lock:
+            mine = set(self._adj.get(user_id, ()))
+            counts = Counter()
+            for friend in mine:
+                counts.update(self._adj.get(friend, ()))
+        skip = mine | set(exclude)
+        skip.add(user_id)
+        candidates = ((n, uid) for uid, n in counts.items() if uid not in skip)
+        best = heapq.nlargest(limit, candidates, key=lambda c: (c[0], -c[1]))
+        return [(uid, n) for n, uid in best]
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def friend_graph():
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = FriendGraph(ttl=getattr(settings, 'FRIEND_GRAPH_TTL', 300))
+    return _graph
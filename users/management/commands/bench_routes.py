@@ -0,0 +1,317 @@
+import json
+import re
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import get_resolver, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.authentication import add_version_claim
+from users.metrics import percentile
+from users.models import FriendRequest, Friendship, Notification
+
+User = get_user_model()
+
+# routes in config/urls.py that are not driven, and why
+SKIPPED = {
+    'friends-accept': 'one-shot state transition (pending request -> accepted)',
+    'friends-reject': 'one-shot state transition (pending request -> rejected)',
+    'friends-cancel': 'one-shot state transition (pending request -> cancelled)',
+    'notifications-stream': 'Server-Sent Events; needs an ASGI server and never completes',
+    'api-signup-batch': 'staff-only bulk insert',
+    'export': 'staff-only full-table export',
+    'metrics': 'staff-only diagnostics',
+    'admin-profiles': 'staff-only diagnostics',
+    'admin-profile-download': 'staff-only diagnostics',
+}
+# routes that add or change rows on every call; only run with --writes
+WRITE_ROUTES = {
+    'api-signup', 'friends-send', 'chat-send',
+    'notifications-mark-read', 'notifications-mark-many-read', 'notifications-mark-all-read',
+}
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class Case:
+
+    def __init__(self, label, route, method='GET', kwargs=None, query='', data=None, auth=True):
+        self.label = label
+        self.route = route
+        self.method = method
+        self.kwargs = kwargs or {}
+        self.query = query
+        self.data = data  # dict, or callable(i) -> dict for per-request bodies
+        self.auth = auth
+
+    @property
+    def path(self):
+        return reverse(self.route, kwargs=self.kwargs) + (f'?{self.query}' if self.query else '')
+
+    def body(self, i):
+        data = self.data(i) if callable(self.data) else self.data
+        return json.dumps(data) if data is not None else None
+
+
+class Command(BaseCommand):
+    help = ("Benchmark every route in config/urls.py through the test client (or a running "
+            "server with --base-url) and save throughput / latency percentiles as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per case.')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per case first.')
+        parser.add_argument('--user', help='Email of the user to benchmark as (default: most-connected user).')
+        parser.add_argument('--password', default='xchange-seed', help='Password for the login routes.')
+        parser.add_argument('--only', help='Comma-separated URL names to run.')
+        parser.add_argument('--writes', action='store_true',
+                            help=f'Also run routes that insert rows ({", ".join(sorted(WRITE_ROUTES))}).')
+        parser.add_argument('--base-url', help='Drive a running server (e.g. http://127.0.0.1:8000) instead.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients (with --base-url).')
+        parser.add_argument('--output', help='JSON file to write (default: var/bench/<timestamp>.json).')
+        parser.add_argument('--compare', help='Earlier JSON result to print p50/p95 deltas against.')
+
+    def handle(self, *args, **options):
+        me = self.pick_user(options['user'])
+        cases = self.build_cases(me, options['password'], options['writes'],
+                                 options['warmup'] + options['requests'])
+        if options['only']:
+            only = {x.strip() for x in options['only'].split(',') if x.strip()}
+            cases = [c for c in cases if c.route in only]
+        access = str(add_version_claim(RefreshToken.for_user(me), me).access_token)
+
+        if options['base_url']:
+            transport = _HttpTransport(options['base_url'].rstrip('/'), access)
+        else:
+            transport = _ClientTransport(access)
+        concurrency = max(1, options['concurrency']) if options['base_url'] else 1
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for case in cases:
+                results.append(self.run_case(transport, case, options['warmup'], options['requests'], concurrency))
+
+        report = {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'transport': options['base_url'] or 'test-client',
+            'concurrency': concurrency,
+            'requests_per_case': options['requests'],
+            'database': {'vendor': connection.vendor, 'users': User.objects.count(),
+                         'friendships': Friendship.objects.count(),
+                         'notifications': Notification.objects.count()},
+            'user_id': me.id,
+            'cases': results,
+            'skipped': {**SKIPPED, **({} if options['writes'] else
+                                       {r: 'inserts rows; pass --writes' for r in WRITE_ROUTES})},
+            'not_covered': self.uncovered_routes(cases),
+        }
+        self.print_table(results)
+        if options['compare']:
+            self.print_comparison(results, json.loads(Path(options['compare']).read_text()))
+        output = Path(options['output'] or settings.BASE_DIR / 'var' / 'bench' /
+                      f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}'))
+
+    # -------------------------
+    # fixtures
+    # -------------------------
+    def pick_user(self, email):
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f'No user with email {email}')
+        counts = Counter()
+        for column in ('user1_id', 'user2_id'):
+            rows = Friendship.objects.values(column).annotate(n=Count('id')).order_by('-n')[:50]
+            counts.update({r[column]: r['n'] for r in rows})
+        user = max(User.objects.filter(id__in=list(counts), is_active=True),
+                   key=lambda u: counts[u.id], default=None)
+        user = user or User.objects.filter(is_active=True).first()
+        if user is None:
+            raise CommandError('No users to benchmark with; run seed_social_graph first.')
+        return user
+
+    def build_cases(self, me, password, writes, calls):
+        friend = (Friendship.objects.filter(Q(user1=me) | Q(user2=me))
+                  .values_list('user1_id', 'user2_id').first())
+        friend_id = (friend[1] if friend[0] == me.id else friend[0]) if friend else me.id
+        # a fresh target per friend request; a repeat would be a 400 (already pending / friends)
+        connected = (Friendship.objects.filter(Q(user1=me) | Q(user2=me)).values_list('user1_id', 'user2_id'),
+                     FriendRequest.objects.filter(Q(from_user=me) | Q(to_user=me)).values_list('from_user_id', 'to_user_id'))
+        taken = {uid for rows in connected for pair in rows for uid in pair} | {me.id}
+        strangers = list(User.objects.filter(is_active=True).exclude(id__in=taken)
+                         .order_by('-id').values_list('id', flat=True)[:calls]) or [me.id]
+        notif_ids = list(Notification.objects.filter(user=me).order_by('-id').values_list('id', flat=True)[:20])
+        some_ids = ','.join(str(i) for i in User.objects.order_by('-id').values_list('id', flat=True)[:20])
+        skill = (me.skills or ['python'])[0]
+        lang = (me.languages or ['english'])[0]
+        login = {'email': me.email, 'password': password}
+        refresh = str(add_version_claim(RefreshToken.for_user(me), me))
+
+        cases = [
+            Case('home page', 'home', auth=False),
+            Case('login page', 'login', auth=False),
+            Case('signup page', 'signup', auth=False),
+            Case('token (password login)', 'token_obtain_pair', 'POST',
+                 data={**login, 'username': me.get_username()}, auth=False),
+            Case('token (email login)', 'token_obtain_email', 'POST', data=login, auth=False),
+            Case('token refresh', 'token_refresh', 'POST', data={'refresh': refresh}, auth=False),
+            Case('me', 'api-me'),
+            Case('bootstrap', 'api-bootstrap'),
+            Case('feed', 'api-users'),
+            Case('feed: skills+lang', 'api-users', query=f'skills={skill}&lang={lang}'),
+            Case('feed: age', 'api-users', query='age=18-25'),
+            Case('feed: search', 'api-users', query=f'search={skill}'),
+            Case('recommended', 'api-users-recommended'),
+            Case('requests received', 'friends-received'),
+            Case('requests sent', 'friends-sent'),
+            Case('friends', 'friends-list'),
+            Case('suggestions', 'friends-suggestions'),
+            Case('mutual counts', 'friends-mutual', query=f'ids={some_ids}'),
+            Case('notifications', 'notifications-list'),
+            Case('unread count', 'notifications-unread-count'),
+            Case('chat history', 'chat-history', kwargs={'user_id': friend_id}),
+        ]
+        if writes:
+            stamp = int(time.time())
+            cases += [
+                Case('signup', 'api-signup', 'POST', auth=False, data=lambda i: {
+                    'full_name': 'Bench User', 'email': f'bench-{stamp}-{i}@example.com', 'password': password,
+                    'age': 30, 'bio': ' '.join(['word'] * 120), 'skills': ['Python'], 'languages': ['English'],
+                }),
+                Case('send friend request', 'friends-send', 'POST',
+                     data=lambda i: {'to_user': strangers[i % len(strangers)]}),
+                Case('chat send', 'chat-send', 'POST', kwargs={'user_id': friend_id}, data={'message': 'benchmark'}),
+                Case('mark one read', 'notifications-mark-read', 'POST',
+                     kwargs={'pk': notif_ids[0] if notif_ids else 0}),
+                Case('mark many read', 'notifications-mark-many-read', 'POST', data={'ids': notif_ids}),
+                Case('mark all read', 'notifications-mark-all-read', 'POST'),
+            ]
+        return cases
+
+    def uncovered_routes(self, cases):
+        names = {name for name in get_resolver().reverse_dict.keys() if isinstance(name, str)}
+        covered = {c.route for c in cases} | set(SKIPPED) | WRITE_ROUTES
+        return sorted(names - covered)
+
+    # -------------------------
+    # running / reporting
+    # -------------------------
+    def run_case(self, transport, case, warmup, n, concurrency):
+        for i in range(warmup):
+            transport.request(case, i)
+        statuses = Counter()
+        latencies = []
+        queries = []
+
+        def one(i):
+            start = time.perf_counter()
+            status, timing = transport.request(case, warmup + i)
+            return time.perf_counter() - start, status, timing
+
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(concurrency) as pool:
+                samples = list(pool.map(one, range(n)))
+        else:
+            samples = [one(i) for i in range(n)]
+        wall = time.perf_counter() - started
+
+        for seconds, status, timing in samples:
+            latencies.append(seconds * 1000)
+            statuses[status] += 1
+            match = SERVER_TIMING_DB.search(timing or '')
+            if match:
+                queries.append(int(match.group(2)))
+        latencies.sort()
+        return {
+            'label': case.label,
+            'route': case.route,
+            'method': case.method,
+            'path': case.path,
+            'n': n,
+            'status': {str(k): v for k, v in sorted(statuses.items())},
+            # any non-2xx/3xx, and 0 for a connection failure
+            'errors': sum(v for k, v in statuses.items() if k >= 400 or k == 0),
+            'rps': round(n / wall, 1) if wall else None,
+            'mean_ms': round(sum(latencies) / n, 2) if n else None,
+            **{f'p{int(q * 100)}_ms': round(percentile(latencies, q), 2) for q in (0.5, 0.9, 0.95, 0.99)},
+            'max_ms': round(latencies[-1], 2) if latencies else None,
+            'queries': round(sum(queries) / len(queries), 1) if queries else None,
+        }
+
+    def print_table(self, results):
+        self.stdout.write(f"{'case':<26} {'status':<14} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'q':>5}")
+        for r in results:
+            status = ','.join(f'{k}x{v}' for k, v in r['status'].items())
+            self.stdout.write(
+                f"{r['label']:<26} {status:<14} {r['rps'] or 0:>8.1f} {r['p50_ms']:>8.2f} "
+                f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['queries'] if r['queries'] is not None else '-':>5}")
+
+    def print_comparison(self, results, previous):
+        before = {c['label']: c for c in previous.get('cases', [])}
+        self.stdout.write(f"\n{'case':<26} {'p50 before':>11} {'after':>8} {'p95 before':>11} {'after':>8}")
+        for r in results:
+            old = before.get(r['label'])
+            if old is None:
+                continue
+            self.stdout.write(f"{r['label']:<26} {old['p50_ms']:>11.2f} {r['p50_ms']:>8.2f} "
+                              f"{old['p95_ms']:>11.2f} {r['p95_ms']:>8.2f}")
+
+
+class _ClientTransport:
+    """In-process: Django test client, no sockets."""
+
+    def __init__(self, access):
+        self.client = Client()
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+
+    def request(self, case, i):
+        extra = self.auth if case.auth else {}
+        method = getattr(self.client, case.method.lower())
+        body = case.body(i)
+        if body is None:
+            response = method(case.path, **extra)
+        else:
+            response = method(case.path, body, content_type='application/json', **extra)
+        return response.status_code, response.get('Server-Timing')
+
+
+class _HttpTransport:
+    """Against a running server (runserver / uvicorn / gunicorn)."""
+
+    def __init__(self, base_url, access):
+        self.base_url = base_url
+        self.access = access
+
+    def request(self, case, i):
+        body = case.body(i)
+        req = urllib.request.Request(self.base_url + case.path, method=case.method,
+                                     data=body.encode() if body is not None else None)
+        if body is not None:
+            req.add_header('Content-Type', 'application/json')
+        if case.auth:
+            req.add_header('Authorization', f'Bearer {self.access}')
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+                return response.status, response.headers.get('Server-Timing')
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            return exc.code, exc.headers.get('Server-Timing')
+        except OSError:
+            return 0, None
@@ -0,0 +1,103 @@
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from rest_framework.renderers import JSONRenderer
+
+from users.management.commands.bench_routes import Command as RouteBenchmark
+from users.models import Friendship, Notification
+from users.read_serializers import FeedUserReadSerializer, FriendshipReadSerializer, NotificationReadSerializer
+from users.relationships import relationships
+from users.renderers import FastJSONRenderer, orjson
+from users.serializers import FeedUserSerializer, FriendshipSerializer, NotificationSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Per-item cost of the list serializers: ModelSerializer vs values_list() read "
+            "serializer (users/read_serializers.py), and JSONRenderer vs FastJSONRenderer.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user to serialize for (default: most-connected user).')
+        parser.add_argument('--limit', type=int, default=50, help='Rows per list (like one page).')
+        parser.add_argument('--repeat', type=int, default=200, help='Timed runs per measurement.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+
+    # same default user as bench_routes
+    pick_user = RouteBenchmark.pick_user
+
+    def handle(self, *args, **options):
+        me = self.pick_user(options['user'])
+        limit, repeat = options['limit'], options['repeat']
+        lists = [
+            ('feed', FeedUserSerializer, FeedUserReadSerializer,
+             User.objects.filter(is_active=True).order_by('feed_key', 'id')[:limit]),
+            ('friends', FriendshipSerializer, FriendshipReadSerializer,
+             Friendship.objects.filter(Q(user1=me) | Q(user2=me)).order_by('-created_at')[:limit]),
+            ('notifications', NotificationSerializer, NotificationReadSerializer,
+             Notification.objects.filter(user=me).order_by('-created_at')[:limit]),
+        ]
+
+        results = []
+        for name, model_serializer, read_serializer, queryset in lists:
+            instances = list(queryset)
+            rows = list(read_serializer.values(queryset))
+            if not rows:
+                self.stdout.write(self.style.WARNING(f'  {name}: no rows, skipped'))
+                continue
+            # embeds / relationships are shared lookups, not per-item work: warm both once
+            shared = {'request': SimpleNamespace(user=me), 'profiles': {}}
+            read_serializer(rows, many=True, context=dict(shared)).data
+            shared['relationships'] = relationships(me, [u.id for u in instances]) if name == 'feed' else {}
+
+            def context():
+                return {**shared, 'profiles': dict(shared['profiles'])}
+
+            expected = model_serializer(instances, many=True, context=context()).data
+            same = JSONRenderer().render(expected) == JSONRenderer().render(read_serializer(rows, many=True, context=context()).data)
+            if not same:
+                self.stderr.write(self.style.ERROR(f'  {name}: read serializer output differs'))
+
+            n = len(rows)
+            result = {
+                'list': name,
+                'items': n,
+                'identical': same,
+                'model_us': self.per_item(lambda: model_serializer(instances, many=True, context=context()).data, n, repeat),
+                'values_us': self.per_item(lambda: read_serializer(rows, many=True, context=context()).data, n, repeat),
+                'load_model_us': self.per_item(lambda: list(queryset.all()), n, max(1, repeat // 10)),
+                'load_values_us': self.per_item(lambda: list(read_serializer.values(queryset)), n, max(1, repeat // 10)),
+                'json_us': self.per_item(lambda: JSONRenderer().render(expected), n, repeat),
+                'fast_json_us': self.per_item(lambda: FastJSONRenderer().render(expected), n, repeat),
+            }
+            results.append(result)
+
+        if not results:
+            raise CommandError('Nothing to measure; seed the database first (manage.py seed_social_graph).')
+        self.print_table(results)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+
+    @staticmethod
+    def per_item(fn, items, repeat):
+        fn()  # warm up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return round((time.perf_counter() - start) / repeat / items * 1e6, 2)
+
+    def print_table(self, results):
+        renderer = 'orjson' if orjson is not None else 'stdlib (orjson not installed)'
+        self.stdout.write(f"\nmicroseconds per item; FastJSONRenderer uses {renderer}")
+        self.stdout.write(f"{'list':<14} {'items':>5} {'load model':>11} {'values':>8} "
+                          f"{'serialize model':>16} {'values':>8} {'render json':>12} {'fast':>8}")
+        for r in results:
+            self.stdout.write(
+                f"{r['list']:<14} {r['items']:>5} {r['load_model_us']:>11.2f} {r['load_values_us']:>8.2f} "
+                f"{r['model_us']:>16.2f} {r['values_us']:>8.2f} {r['json_us']:>12.2f} {r['fast_json_us']:>8.2f}"
+            )
@@ -0,0 +1,147 @@
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from config.sqlite_profiles import PROFILES
+from users.db_router import read_only_db
+from users.metrics import percentile
+from users.models import Friendship, Notification
+
+
+class Command(BaseCommand):
+    help = ("Compare SQLite profiles (config/sqlite_profiles.py) under concurrent reads and "
+            "friend-request style writes, on a copy of the current database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(PROFILES))
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        # internal: run one profile in this process (spawned by the parent run)
+        parser.add_argument('--worker', action='store_true', help='(internal)')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            return self.run_worker(options)
+
+        source = Path(settings.DATABASES['default']['NAME'])
+        if not source.is_file():
+            raise CommandError(f'{source} does not exist; migrate and seed it first.')
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in [p.strip() for p in options['profiles'].split(',') if p.strip()]:
+                if profile not in PROFILES:
+                    raise CommandError(f'Unknown profile {profile}; one of {", ".join(PROFILES)}')
+                copy = Path(tmp) / f'{profile}.sqlite3'
+                self.copy_database(source, copy)
+                results[profile] = self.spawn(profile, copy, options)
+                self.stdout.write(f'  {profile}: {results[profile]["reads_per_s"]} reads/s, '
+                                  f'{results[profile]["writes_per_s"]} writes/s, '
+                                  f'{results[profile]["errors"]} lock errors')
+
+        self.print_table(results)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+
+    @staticmethod
+    def copy_database(source, target):
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(target)
+        try:
+            src.backup(dst)
+            dst.execute('PRAGMA journal_mode=DELETE')  # each profile sets its own mode
+        finally:
+            src.close()
+            dst.close()
+
+    def spawn(self, profile, path, options):
+        env = {**os.environ, 'XCHANGE_SQLITE_PROFILE': profile, 'XCHANGE_DB_PATH': str(path)}
+        cmd = [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'bench_sqlite', '--worker',
+               '--writers', str(options['writers']), '--readers', str(options['readers']),
+               '--seconds', str(options['seconds']), '--skip-checks']
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise CommandError(f'{profile} run failed:\n{proc.stderr[-2000:]}')
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def print_table(self, results):
+        self.stdout.write(f"\n{'profile':<8} {'reads/s':>9} {'writes/s':>9} {'read p95':>9} "
+                          f"{'write p95':>10} {'errors':>7}")
+        for profile, r in results.items():
+            self.stdout.write(f"{profile:<8} {r['reads_per_s']:>9} {r['writes_per_s']:>9} "
+                              f"{r['read_p95_ms']:>9} {r['write_p95_ms']:>10} {r['errors']:>7}")
+
+    # -------------------------
+    # worker: one profile, N reader + M writer threads
+    # -------------------------
+    def run_worker(self, options):
+        user_ids = list(Friendship.objects.values_list('user1_id', flat=True).distinct()[:500])
+        if len(user_ids) < 2:
+            raise CommandError('Need a seeded database (python manage.py seed_social_graph).')
+        deadline = time.perf_counter() + options['seconds']
+        samples = {'read': [], 'write': []}
+        errors = []
+        lock = threading.Lock()
+
+        def read_once(rng):
+            uid = rng.choice(user_ids)
+            with read_only_db():
+                list(Notification.objects.filter(user_id=uid).order_by('-created_at')[:50])
+                list(Friendship.objects.filter(user1_id=uid).order_by('-created_at')[:50])
+
+        def write_once(rng):
+            uid, actor = rng.sample(user_ids, 2)
+            # shaped like SendFriendRequestView: read, then write, in one
+            # transaction (the read->write lock upgrade is what deadlocks
+            # deferred transactions into "database is locked")
+            with transaction.atomic():
+                Friendship.objects.filter(user1_id=min(uid, actor), user2_id=max(uid, actor)).exists()
+                Notification.objects.create(user_id=uid, actor_user_id=actor,
+                                            type=Notification.NOTIF_FRIEND_REQUEST, text='bench')
+
+        def loop(kind, op):
+            rng = random.Random()
+            mine, failed = [], 0
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        op(rng)
+                    except OperationalError:  # "database is locked"
+                        failed += 1
+                        continue
+                    mine.append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                samples[kind].extend(mine)
+                errors.append(failed)
+
+        threads = [threading.Thread(target=loop, args=('write', write_once)) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=loop, args=('read', read_once)) for _ in range(options['readers'])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        seconds = options['seconds']
+        result = {'profile': settings.SQLITE_PROFILE, 'seconds': seconds,
+                  'writers': options['writers'], 'readers': options['readers'], 'errors': sum(errors)}
+        for kind in ('read', 'write'):
+            values = sorted(samples[kind])
+            result[f'{kind}s_per_s'] = round(len(values) / seconds, 1)
+            result[f'{kind}_p50_ms'] = round(percentile(values, 0.5), 2) if values else None
+            result[f'{kind}_p95_ms'] = round(percentile(values, 0.95), 2) if values else None
+        self.stdout.write(json.dumps(result))
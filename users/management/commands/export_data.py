@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from users.export import EXPORTS, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream users / friendships / friend_requests / notifications as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--after-id', type=int, help='Only rows with a larger id (incremental pulls).')
+        parser.add_argument('--updated-since', help='ISO datetime; only rows changed since then.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--output', '-o', default='-', help="File to write, '-' for stdout.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['updated_since']:
+            since = parse_datetime(options['updated_since'])
+            if since is None:
+                raise CommandError('--updated-since must be an ISO datetime')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        out = sys.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8', newline='')
+        try:
+            for chunk in stream_export(options['kind'], options['format'], after_id=options['after_id'],
+                                       updated_since=since, chunk_size=options['chunk_size']):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
@@ -0,0 +1,85 @@
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_signup import import_users
+from users.password_pool import hash_pool
+
+
+def parse_list(value):
+    # CSV cells: JSON array ('["Python", "ML"]') or 'Python;ML'
+    value = (value or '').strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [x.strip() for x in value.split(';') if x.strip()]
+
+
+def read_csv(handle):
+    for row in csv.DictReader(handle):
+        try:
+            row = {k: v for k, v in row.items() if k and v not in (None, '')}
+            for field in ('skills', 'languages'):
+                if field in row:
+                    row[field] = parse_list(row[field])
+            yield row
+        except ValueError as exc:
+            yield ValueError(f'invalid list cell: {exc}')
+
+
+def read_jsonl(handle):
+    for line in handle:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield ValueError(f'invalid JSON: {exc}')
+
+
+class Command(BaseCommand):
+    help = ("Create users from a CSV or JSON-lines file with the signup validation rules "
+            "(full_name, email, password, bio, age, avatar_url, skills, languages).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV / .jsonl file, or '-' for stdin")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='Default: from the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4, help='Password-hashing processes (0: hash inline).')
+        parser.add_argument('--report', help='Write one JSON result per input row to this file.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if path != '-' and not Path(path).is_file():
+            raise CommandError(f'No such file: {path}')
+
+        handle = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        report = open(options['report'], 'w', encoding='utf-8') if options['report'] else None
+        executor = hash_pool(options['workers']) if options['workers'] > 0 else None
+        created = failed = 0
+        started = time.perf_counter()
+        try:
+            rows = read_jsonl(handle) if fmt == 'jsonl' else read_csv(handle)
+            for result in import_users(rows, chunk_size=options['chunk_size'], executor=executor):
+                if 'id' in result:
+                    created += 1
+                else:
+                    failed += 1
+                    if failed <= 20:
+                        self.stderr.write(f"line {result['line']}: {json.dumps(result['errors'])}")
+                if report:
+                    report.write(json.dumps(result) + '\n')
+        finally:
+            if executor:
+                executor.shutdown()
+            if report:
+                report.close()
+            if handle is not sys.stdin:
+                handle.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} users, rejected {failed} rows in {time.perf_counter() - started:.1f}s.'))
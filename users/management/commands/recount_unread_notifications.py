@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.notifications import recount_unread
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's unread-notification counter from the notifications table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        n = recount_unread(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Recounted unread notifications ({n} users with unread)."))
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users import outbox
+
+
+class Command(BaseCommand):
+    help = ("Run queued side effects (OutboxJob rows, see users/outbox.py). Keeps polling "
+            "until interrupted; run one or more next to the web server.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'OUTBOX_BATCH_SIZE', 100))
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'OUTBOX_POLL_INTERVAL', 1.0),
+                            help='Seconds to sleep when no job is due.')
+        parser.add_argument('--once', action='store_true', help='Run the jobs due now, then exit.')
+
+    def handle(self, *args, **options):
+        worker = outbox.worker_name()
+        if options['once']:
+            n = outbox.run_pending(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Ran {n} outbox jobs."))
+            return
+
+        self.stdout.write(f"Outbox worker {worker} started.")
+        try:
+            while True:
+                n = outbox.run_batch(options['batch_size'], worker)
+                if n and options['verbosity'] > 1:
+                    self.stdout.write(f"  {n} jobs")
+                close_old_connections()
+                if n < options['batch_size']:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox worker stopped.")
@@ -0,0 +1,201 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users import bulk
+from users.models import FriendRequest, Friendship, Notification
+from users.notifications import recount_unread
+
+User = get_user_model()
+
+SKILLS = [
+    'Python', 'JavaScript', 'Django', 'React', 'SQL', 'Machine Learning', 'Data Analysis',
+    'Java', 'C++', 'Go', 'Rust', 'Design', 'Figma', 'UI/UX', 'Photography', 'Video Editing',
+    'Guitar', 'Piano', 'Singing', 'Drawing', 'Painting', 'Cooking', 'Baking', 'Yoga',
+    'Public Speaking', 'Writing', 'Marketing', 'SEO', 'Excel', 'Accounting', 'Chess',
+    'Spanish', 'French', 'German', 'Japanese', 'DevOps', 'Kubernetes', 'Docker', 'AWS',
+    'Statistics', 'Calculus', 'Physics', 'Chemistry', 'Gardening', 'Knitting', 'Dance',
+]
+LANGUAGES = [
+    'English', 'Hindi', 'Spanish', 'French', 'German', 'Bengali', 'Tamil', 'Telugu',
+    'Marathi', 'Portuguese', 'Japanese', 'Mandarin', 'Arabic', 'Urdu', 'Russian',
+]
+FIRST_NAMES = [
+    'Aarav', 'Diya', 'Liam', 'Emma', 'Noah', 'Olivia', 'Arjun', 'Priya', 'Mateo', 'Sofia',
+    'Kenji', 'Yuki', 'Omar', 'Layla', 'Lucas', 'Mia', 'Ravi', 'Ananya', 'Ethan', 'Zara',
+]
+LAST_NAMES = [
+    'Sharma', 'Patel', 'Smith', 'Garcia', 'Kim', 'Nguyen', 'Khan', 'Singh', 'Müller',
+    'Rossi', 'Tanaka', 'Silva', 'Ivanov', 'Brown', 'Das', 'Iyer', 'Lopez', 'Chen',
+]
+BIO_WORDS = (
+    'I love learning new things and sharing what I know with curious people. '
+    'Currently exploring projects in my free time and looking for partners to practice with. '
+    'Happy to teach the basics and trade skills over video calls or coffee on weekends. '
+    'Patient, friendly, and always up for a challenge that helps both of us grow a little every week.'
+).split()
+
+
+def zipf_weights(n, s=1.1):
+    # a few very popular items, a long tail of rare ones
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+class Command(BaseCommand):
+    help = ("Seed a synthetic social graph: users with skills/languages/bios, a power-law "
+            "(Barabási–Albert) friendship graph, pending friend requests and notifications.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--friends', type=int, default=3,
+                            help='Edges each new user attaches with (BA parameter m); avg degree is ~2m.')
+        parser.add_argument('--requests', type=int, default=2, help='Pending friend requests sent per user.')
+        parser.add_argument('--notifications', type=int, default=5, help='Extra notifications per user.')
+        parser.add_argument('--read-ratio', type=float, default=0.7, help='Share of notifications already read.')
+        parser.add_argument('--prefix', default='seed', help='Username / email prefix of seeded users.')
+        parser.add_argument('--password', default='xchange-seed', help='Password of every seeded user.')
+        parser.add_argument('--random-seed', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        n = options['users']
+        m = options['friends']
+        if n < m + 1:
+            raise CommandError(f'--users must be at least --friends + 1 ({m + 1})')
+        self.rng = random.Random(options['random_seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Users with prefix "{prefix}" already exist; pass another --prefix.')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            ids = self.create_users(n, prefix, make_password(options['password']))
+            self.step('users', len(ids))
+            pairs = self.preferential_attachment(ids, m)
+            self.create_friendships(pairs)
+            self.step('friendships', len(pairs))
+            requests = self.create_requests(ids, pairs, options['requests'])
+            self.step('friend requests', len(requests))
+            notes = self.create_notifications(ids, requests, options['notifications'], options['read_ratio'])
+            self.step('notifications', notes)
+            # bulk_create skipped the per-row counter updates
+            recount_unread(batch_size=self.batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {n} users in {time.perf_counter() - started:.1f}s '
+            f'(password "{options["password"]}", e.g. {prefix}0@example.com).'))
+
+    def step(self, label, count):
+        self.stdout.write(f'  {label}: {count}')
+
+    # -------------------------
+    # users
+    # -------------------------
+    def create_users(self, n, prefix, password):
+        rng = self.rng
+        skill_w = zipf_weights(len(SKILLS))
+        lang_w = zipf_weights(len(LANGUAGES), s=1.5)
+        ids = []
+        self.usernames = {}
+        for start in range(0, n, self.batch_size):
+            chunk = []
+            for i in range(start, min(n, start + self.batch_size)):
+                username = f'{prefix}{i}'
+                chunk.append(User(
+                    username=username,
+                    email=f'{username}@example.com',
+                    password=password,
+                    full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    age=max(14, min(80, int(rng.gauss(28, 9)))),
+                    bio=' '.join(rng.choices(BIO_WORDS, k=rng.randint(100, 200))),
+                    skills=self.pick(SKILLS, skill_w, rng.randint(1, 5)),
+                    languages=self.pick(LANGUAGES, lang_w, rng.choice((1, 1, 2, 2, 3))),
+                ))
+            created = User.objects.bulk_create(chunk)
+            if created and created[0].pk is None:  # backend without RETURNING
+                by_name = dict(User.objects.filter(username__in=[u.username for u in created])
+                               .values_list('username', 'id'))
+                for u in created:
+                    u.pk = by_name[u.username]
+            bulk.users_created(created)
+            ids.extend(u.pk for u in created)
+            self.usernames.update((u.pk, u.username) for u in created)
+        return ids
+
+    def pick(self, items, weights, k):
+        chosen = []
+        while len(chosen) < k:
+            item = self.rng.choices(items, weights)[0]
+            if item not in chosen:
+                chosen.append(item)
+        return chosen
+
+    # -------------------------
+    # friendships: Barabási–Albert preferential attachment
+    # -------------------------
+    def preferential_attachment(self, ids, m):
+        rng = self.rng
+        pairs = set()
+        # every endpoint of every edge, so a uniform pick is degree-weighted
+        endpoints = []
+        seed = ids[:m + 1]
+        for i, a in enumerate(seed):
+            for b in seed[i + 1:]:
+                pairs.add((a, b))
+                endpoints += (a, b)
+        for new in ids[m + 1:]:
+            targets = set()
+            while len(targets) < m:
+                targets.add(rng.choice(endpoints))
+            for t in targets:
+                pairs.add((min(new, t), max(new, t)))
+                endpoints += (new, t)
+        return pairs
+
+    def create_friendships(self, pairs):
+        rows = [Friendship(user1_id=a, user2_id=b) for a, b in pairs]
+        Friendship.objects.bulk_create(rows, batch_size=self.batch_size)
+        bulk.friendships_created(rows)
+
+    # -------------------------
+    # pending requests + notifications
+    # -------------------------
+    def create_requests(self, ids, friend_pairs, per_user):
+        rng = self.rng
+        taken = set(friend_pairs)
+        rows = []
+        for from_id in ids:
+            for _ in range(per_user):
+                to_id = rng.choice(ids)
+                key = (min(from_id, to_id), max(from_id, to_id))
+                if to_id == from_id or key in taken:
+                    continue
+                taken.add(key)
+                rows.append(FriendRequest(from_user_id=from_id, to_user_id=to_id))
+        return FriendRequest.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def create_notifications(self, ids, requests, per_user, read_ratio):
+        rng = self.rng
+        rows = [
+            Notification(user_id=fr.to_user_id, actor_user_id=fr.from_user_id,
+                         type=Notification.NOTIF_FRIEND_REQUEST,
+                         text=f'{self.usernames[fr.from_user_id]} sent you a connection request',
+                         data={'request_id': fr.pk})
+            for fr in requests
+        ]
+        for user_id in ids:
+            for _ in range(per_user):
+                actor = rng.choice(ids)
+                kind = rng.choice((Notification.NOTIF_FRIEND_ACCEPT, Notification.NOTIF_MESSAGE,
+                                   Notification.NOTIF_SYSTEM))
+                rows.append(Notification(
+                    user_id=user_id, actor_user_id=None if kind == Notification.NOTIF_SYSTEM else actor,
+                    type=kind, text=f'{kind.replace("_", " ")} (seeded)', is_read=rng.random() < read_ratio,
+                ))
+        # counters are rebuilt by recount_unread(); nothing is live-pushed
+        Notification.objects.bulk_create(rows, batch_size=self.batch_size)
+        return len(rows)
@@ -0,0 +1,106 @@
+# backend/users/metrics.py
+# In-process request metrics, fed by users.middleware.PerformanceMiddleware
+# and exported in Prometheus text format by MetricsView (/api/metrics/).
+#
+# Each (url name, metric) pair keeps a running count/sum plus a ring buffer of
+# the most recent PERF_METRICS_SAMPLES observations; p50/p95/p99 are computed
+# from that window when the endpoint is scraped. Numbers are per process.
+import math
+import threading
+from collections import deque
+
+from django.conf import settings
+
+# metric -> (Prometheus name, help text)
+METRICS = {
+    'total': ('xchange_request_seconds', 'Wall time of the whole request.'),
+    'view': ('xchange_view_seconds', 'Time in the view, including serialization.'),
+    'render': ('xchange_render_seconds', 'Time rendering the response body.'),
+    'db': ('xchange_db_seconds', 'Time waiting on database queries.'),
+    'queries': ('xchange_db_queries', 'Database queries per request.'),
+    'bytes': ('xchange_response_bytes', 'Response body size.'),
+}
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Summary:
+
+    def __init__(self, samples):
+        self.count = 0
+        self.sum = 0.0
+        self.window = deque(maxlen=samples)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.window.append(value)
+
+    def quantiles(self, qs=QUANTILES):
+        ordered = sorted(self.window)
+        return {q: percentile(ordered, q) for q in qs}
+
+
+class MetricsRegistry:
+
+    def __init__(self, samples=1024):
+        self.samples = samples
+        self._summaries = {}  # (metric, route) -> Summary
+        self._lock = threading.Lock()
+
+    def observe(self, route, values):
+        """values: {metric: number} for one request."""
+        with self._lock:
+            for metric, value in values.items():
+                summary = self._summaries.get((metric, route))
+                if summary is None:
+                    summary = self._summaries[(metric, route)] = Summary(self.samples)
+                summary.observe(value)
+
+    def snapshot(self):
+        """{(metric, route): (count, sum, {quantile: value})}"""
+        with self._lock:
+            return {
+                key: (s.count, s.sum, s.quantiles())
+                for key, s in self._summaries.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+
+    def to_prometheus(self):
+        snap = self.snapshot()
+        lines = []
+        for metric, (name, help_text) in METRICS.items():
+            rows = sorted((route, data) for (m, route), data in snap.items() if m == metric)
+            if not rows:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} summary')
+            for route, (count, total, quantiles) in rows:
+                label = _escape(route)
+                for q, value in quantiles.items():
+                    lines.append(f'{name}{{route="{label}",quantile="{q}"}} {_fmt(value)}')
+                lines.append(f'{name}_sum{{route="{label}"}} {_fmt(total)}')
+                lines.append(f'{name}_count{{route="{label}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile (0 < q <= 1) of an already sorted list."""
+    if not ordered:
+        return math.nan
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _fmt(value):
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value))
+
+
+registry = MetricsRegistry(samples=getattr(settings, 'PERF_METRICS_SAMPLES', 1024))
@@ -0,0 +1,219 @@
+# backend/users/middleware.py
+# PerformanceMiddleware: per-request timing for every URL name.
+# ProfilingMiddleware: opt-in cProfile capture of a single request.
+# CompressionMiddleware: Brotli / gzip for large API responses.
+#
+# Measures DB query count/time (connection.execute_wrapper), view time,
+# render time (DRF / template responses are rendered after the view returns)
+# and response size, records them in users.metrics.registry and reports them
+# to the browser as a Server-Timing header (visible in devtools' Network tab).
+#
+# Async views (the SSE stream) only get total time: their queries run in
+# sync_to_async worker threads the wrapper can't see, and a streaming body
+# has no size or render step.
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import profiling
+from .authentication import CachedJWTAuthentication
+from .metrics import registry
+
+# Brotli is optional: without it responses are only gzip-compressed
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+class QueryTimer:
+    """execute_wrapper callable that counts queries and their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.route or 'unnamed'
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'PERF_SERVER_TIMING', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        request._perf_start = start
+        timer = QueryTimer()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        view = getattr(request, '_perf_view', total)
+        render = getattr(request, '_perf_render', 0.0)
+        values = {'total': total, 'view': view, 'render': render,
+                  'db': timer.seconds, 'queries': timer.count}
+        if not response.streaming:
+            values['bytes'] = len(response.content)
+        registry.observe(_route(request), values)
+        if self.server_timing:
+            response['Server-Timing'] = self._header(values)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        total = time.perf_counter() - start
+        values = {'total': total}
+        if not response.streaming:
+            values['bytes'] = len(response.content)
+        registry.observe(_route(request), values)
+        if self.server_timing:
+            response['Server-Timing'] = self._header(values)
+        return response
+
+    def process_template_response(self, request, response):
+        # runs after the view, right before response.render()
+        start = getattr(request, '_perf_start', None)
+        if start is None:
+            return response
+        render_start = time.perf_counter()
+        request._perf_view = render_start - start
+
+        def rendered(response):
+            request._perf_render = time.perf_counter() - render_start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def _header(values):
+        parts = []
+        if 'db' in values:
+            parts.append(f'db;dur={values["db"] * 1000:.1f};desc="{values["queries"]} queries"')
+        for name in ('view', 'render', 'total'):
+            if name in values:
+                parts.append(f'{name};dur={values[name] * 1000:.1f}')
+        return ', '.join(parts)
+
+
+class ProfilingMiddleware:
+    """Profile a request when a staff user asks for it with an
+    `X-Profile: 1` header or `?_profile=1`, subject to PROFILE_SAMPLE_RATE.
+    The capture name comes back in an X-Profile-Capture header.
+
+    Without the flag this is one dict lookup and a substring test; nothing
+    is authenticated or profiled."""
+    sync_capable = True
+    async_capable = True
+    header = 'HTTP_X_PROFILE'
+    query_param = '_profile'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)  # async views are not profiled
+        if not self.requested(request) or not self.allowed(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        response, profiler = profiling.run_profiled(self.get_response, request)
+        name = profiling.save_capture(profiler, _route(request), time.perf_counter() - start)
+        response['X-Profile-Capture'] = name
+        return response
+
+    def requested(self, request):
+        if request.META.get(self.header) == '1':
+            return True
+        return (self.query_param in request.META.get('QUERY_STRING', '')
+                and request.GET.get(self.query_param) == '1')
+
+    def allowed(self, request):
+        rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        return _staff_user(request) is not None
+
+
+def _staff_user(request):
+    """Staff user from the admin session or a bearer token (API clients)."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return user
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None and result[0].is_staff:
+        return result[0]
+    return None
+
+
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers Brotli when the client accepts it and the
+    brotli package is installed, and only bothers with bodies of at least
+    COMPRESS_MIN_LENGTH bytes. Streaming responses (notification stream,
+    exports) pass through untouched so events aren't held in a compressor."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, 'COMPRESS_MIN_LENGTH', 1024)
+        self.brotli_quality = getattr(settings, 'COMPRESS_BROTLI_QUALITY', 5)
+
+    def process_response(self, request, response):
+        if response.streaming or len(response.content) < self.min_length:
+            return response
+        if brotli is None or response.has_header('Content-Encoding'):
+            return super().process_response(request, response)
+        if not re_accepts_br.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # the body changed, so a strong ETag becomes weak (as GZipMiddleware does)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
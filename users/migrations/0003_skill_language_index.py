@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _norm(values):
+    if isinstance(values, str):
+        values = [values]
+    out = []
+    for v in (values or []):
+        n = str(v).strip().lower()
+        if n and n not in out:
+            out.append(n)
+    return out
+
+
+def backfill_index(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Skill = apps.get_model('users', 'Skill')
+    Language = apps.get_model('users', 'Language')
+    UserSkill = apps.get_model('users', 'UserSkill')
+    UserLanguage = apps.get_model('users', 'UserLanguage')
+
+    skill_ids, lang_ids = {}, {}
+    skill_links, lang_links = [], []
+    for user in User.objects.only('id', 'skills', 'languages').iterator():
+        for name in _norm(user.skills):
+            if name not in skill_ids:
+                skill_ids[name] = Skill.objects.create(name=name).id
+            skill_links.append(UserSkill(user_id=user.id, skill_id=skill_ids[name]))
+        for name in _norm(user.languages):
+            if name not in lang_ids:
+                lang_ids[name] = Language.objects.create(name=name).id
+            lang_links.append(UserLanguage(user_id=user.id, language_id=lang_ids[name]))
+    UserSkill.objects.bulk_create(skill_links, batch_size=1000)
+    UserLanguage.objects.bulk_create(lang_links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_friendrequest_friendship_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Language',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserLanguage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_links', to='users.language')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='language_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['language', 'user'], name='users_userl_languag_1175f1_idx')],
+                'unique_together': {('user', 'language')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSkill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_links', to='users.skill')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'user'], name='users_users_skill_i_492fae_idx')],
+                'unique_together': {('user', 'skill')},
+            },
+        ),
+        migrations.RunPython(backfill_index, migrations.RunPython.noop),
+    ]
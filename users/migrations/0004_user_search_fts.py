@@ -0,0 +1,78 @@
+# Full-text index over users for ?search= (SQLite FTS5 only).
+# The triggers keep the index in step with every INSERT/UPDATE/DELETE on
+# users_user (including bulk_create and queryset.update(), which bypass model
+# signals).
+
+from django.db import migrations
+
+
+FTS_TABLE = 'users_user_fts'
+
+# skills are stored as a JSON array; index the decoded values
+SKILLS_NEW = "(SELECT group_concat(value, ' ') FROM json_each(new.skills))"
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        full_name, username, bio, skills,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON users_user BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, full_name, username, bio, skills)
+        VALUES (new.id, new.full_name, new.username, new.bio, {SKILLS_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON users_user BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF full_name, username, bio, skills ON users_user BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, full_name, username, bio, skills)
+        VALUES (new.id, new.full_name, new.username, new.bio, {SKILLS_NEW});
+    END
+    """,
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, full_name, username, bio, skills)
+    SELECT id, full_name, username, bio,
+           (SELECT group_concat(value, ' ') FROM json_each(users_user.skills))
+    FROM users_user
+    """,
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # other backends fall back to the skill-index search
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_skill_language_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
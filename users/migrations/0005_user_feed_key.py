@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:36
+
+import users.models
+from django.db import migrations, models
+
+from users import fts
+
+
+def shuffle_existing(apps, schema_editor):
+    # AddField evaluated the default once; give every existing user its own key
+    User = apps.get_model('users', 'User')
+    rows = list(User.objects.only('id'))
+    for u in rows:
+        u.feed_key = users.models.random_feed_key()
+    User.objects.bulk_update(rows, ['feed_key'], batch_size=500)
+
+
+def reinstall_fts_triggers(apps, schema_editor):
+    # the table rebuild for the new column dropped the FTS triggers
+    fts.install_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_user_search_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_key',
+            field=models.PositiveIntegerField(default=users.models.random_feed_key, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'feed_key', 'id'], name='users_user_is_acti_041a35_idx'),
+        ),
+        migrations.RunPython(shuffle_existing, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_fts_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Reinstall the users_user_fts triggers from users/fts.py and refill the
+# index from users_user. Repairs databases where an earlier rebuild of
+# users_user dropped the triggers (search then missed later writes);
+# a no-op for the schema otherwise.
+
+from django.db import migrations
+
+from users import fts
+
+
+def reinstall_fts(apps, schema_editor):
+    fts.install(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_outboxjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+    ]
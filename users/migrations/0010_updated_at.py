@@ -0,0 +1,43 @@
+# Modification times on users and notifications, so incremental exports
+# (updated_since) pick up profile edits and is_read changes. Existing rows
+# start from their creation time.
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+from users import fts
+
+
+def backfill(apps, schema_editor):
+    apps.get_model('users', 'User').objects.update(updated_at=F('date_joined'))
+    apps.get_model('users', 'Notification').objects.update(updated_at=F('created_at'))
+
+
+def reinstall_fts_triggers(apps, schema_editor):
+    # the table rebuild for the new column dropped the FTS triggers
+    fts.install_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_reinstall_user_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_fts_triggers, migrations.RunPython.noop),
+    ]
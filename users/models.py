@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+import random
 
 # Use JSONField from django (works on modern Django with SQLite)
 try:
@@ -10,6 +11,14 @@ except Exception:
     # fallback for very old Django (unlikely); store as TextField
     JSONField = models.TextField
 
+def random_feed_key():
+    # position of the user in the shuffled discovery feed (see users/pagination.py)
+    return random.randrange(FEED_KEY_SPACE)
+
+
+FEED_KEY_SPACE = 1 << 31
+
+
 class User(AbstractUser):
     full_name = models.CharField(max_length=150)
     bio = models.TextField(blank=True)
@@ -21,6 +30,20 @@ class User(AbstractUser):
     skills = JSONField(default=list, blank=True)
     languages = JSONField(default=list, blank=True)
     email = models.EmailField(unique=True)
+    feed_key = models.PositiveIntegerField(default=random_feed_key, editable=False)
+    # for incremental exports; queryset.update() must set it explicitly
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # NOTE: on SQLite most ALTERs of users_user rebuild the table and drop the
+    # full-text triggers; migrations touching this model must call
+    # users.fts.install_triggers() afterwards (see 0005_user_feed_key).
+    # The users.E001 database check fails when they are missing.
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # keyset pagination of the discovery feed
+            models.Index(fields=['is_active', 'feed_key', 'id']),
+        ]
 
     def __str__(self):
         return self.full_name or self.username
@@ -101,9 +124,128 @@ class Notification(models.Model):
     data = models.JSONField(null=True, blank=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # set explicitly by the mark-read updates
 
     class Meta:
         indexes = [models.Index(fields=['user', 'is_read']), models.Index(fields=['user', 'created_at'])]
 
     def __str__(self):
         return f"Notif {self.type} -> {self.user} ({'read' if self.is_read else 'new'})"
+
+
+# -------------------------
+# Normalized skill / language index
+# The JSON `skills` / `languages` fields on User stay the source of truth (the
+# API reads and writes them). These tables mirror them so filters can run as
+# indexed joins instead of scanning every user in Python.
+# Kept in sync by users.skill_index (wired through post_save in users.signals).
+# -------------------------
+class Skill(models.Model):
+    # normalized (stripped + lowercased) skill name
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Language(models.Model):
+    # normalized (stripped + lowercased) language name
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class UserSkill(models.Model):
+    user = models.ForeignKey(User, related_name='skill_links', on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, related_name='user_links', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ('user', 'skill')
+        # unique_together covers (user, skill); filters go skill -> users
+        indexes = [models.Index(fields=['skill', 'user'])]
+
+    def __str__(self):
+        return f"{self.user_id} knows {self.skill_id}"
+
+
+class UserLanguage(models.Model):
+    user = models.ForeignKey(User, related_name='language_links', on_delete=models.CASCADE)
+    language = models.ForeignKey(Language, related_name='user_links', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ('user', 'language')
+        indexes = [models.Index(fields=['language', 'user'])]
+
+    def __str__(self):
+        return f"{self.user_id} speaks {self.language_id}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Denormalized unread-notification count per user, so the badge doesn't
+    need to count rows. Maintained by users/notifications.py; rebuild with
+    `manage.py recount_unread_notifications` if it ever drifts.
+    """
+    user = models.OneToOneField(User, primary_key=True, related_name='notification_counter', on_delete=models.CASCADE)
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class Message(models.Model):
+    """
+    Chat message between two users. `conversation` is the canonical
+    "<small_id>:<big_id>" pair (same ordering as Friendship), so a history
+    page is one range scan of the (conversation, id) index.
+    """
+    conversation = models.CharField(max_length=32)
+    sender = models.ForeignKey(User, related_name='sent_messages', on_delete=models.CASCADE)
+    recipient = models.ForeignKey(User, related_name='received_messages', on_delete=models.CASCADE)
+    text = models.TextField(max_length=2000)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['conversation', 'id'])]
+
+    @staticmethod
+    def conversation_key(user_a_id, user_b_id):
+        a, b = sorted((int(user_a_id), int(user_b_id)))
+        return f"{a}:{b}"
+
+    def __str__(self):
+        return f"Message {self.sender_id} -> {self.recipient_id}"
+
+
+class OutboxJob(models.Model):
+    """
+    Side effect (e.g. notifications) recorded in the same transaction as the
+    write that caused it and carried out later by `manage.py run_outbox`
+    (users/outbox.py). `run_after` drives retries with backoff; a job stuck
+    in `running` past the lease is picked up again.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"OutboxJob {self.id} {self.kind} ({self.status})"
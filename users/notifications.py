@@ -0,0 +1,85 @@
+# backend/users/notifications.py
+# Side effects of new Notification rows (unread counters, live push). Called
+# from the post_save handler in users/signals.py; code that inserts
+# notifications with bulk_create (which skips signals) must call
+# notifications_created() itself. Deleting an unread notification takes it
+# off the counter (post_delete, also in users/signals.py).
+import json
+from collections import Counter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, NotificationCounter
+from .realtime import get_broker
+
+
+def notification_event(notif):
+    """JSON payload pushed to streams; same shape as NotificationSerializer."""
+    from .serializers import NotificationSerializer
+    return json.dumps(NotificationSerializer(notif).data, cls=DjangoJSONEncoder)
+
+
+def notifications_created(notifs):
+    notifs = [n for n in notifs if n.pk is not None]
+    if not notifs:
+        return
+
+    # counters move in the same transaction as the inserts
+    for user_id, n in Counter(n.user_id for n in notifs if not n.is_read).items():
+        add_unread(user_id, n)
+
+    def publish():
+        broker = get_broker()
+        for n in notifs:
+            broker.publish(n.user_id, (n.pk, notification_event(n)))
+
+    # only push rows that actually committed
+    transaction.on_commit(publish)
+
+
+# -------------------------
+# Unread counters
+# -------------------------
+def add_unread(user_id, delta):
+    """Atomically add delta (may be negative) to the user's unread count."""
+    if delta >= 0:
+        new_value = F('unread') + delta
+    else:
+        new_value = Greatest(F('unread') + delta, 0)
+    if NotificationCounter.objects.filter(user_id=user_id).update(unread=new_value):
+        return
+    if delta <= 0:
+        return  # no counter yet means zero unread
+    try:
+        with transaction.atomic():
+            NotificationCounter.objects.create(user_id=user_id, unread=delta)
+    except IntegrityError:
+        # created concurrently; apply the increment to that row
+        NotificationCounter.objects.filter(user_id=user_id).update(unread=new_value)
+
+
+def reset_unread(user_id):
+    NotificationCounter.objects.filter(user_id=user_id).update(unread=0)
+
+
+def get_unread(user_id):
+    return (NotificationCounter.objects.filter(user_id=user_id)
+            .values_list('unread', flat=True).first()) or 0
+
+
+def recount_unread(batch_size=1000):
+    """Rebuild every counter from the (user, is_read) index. Returns the
+    number of users with unread notifications."""
+    rows = (Notification.objects.filter(is_read=False)
+            .values('user_id').annotate(n=Count('id')).order_by())
+    counters = [NotificationCounter(user_id=r['user_id'], unread=r['n']) for r in rows]
+    with transaction.atomic():
+        NotificationCounter.objects.update(unread=0)
+        NotificationCounter.objects.bulk_create(
+            counters, batch_size=batch_size,
+            update_conflicts=True, unique_fields=['user'], update_fields=['unread'],
+        )
+    return len(counters)
@@ -0,0 +1,146 @@
+# backend/users/outbox.py
+# Transactional outbox for side effects of request writes (notifications
+# today; email / push fan-out would register more handlers).
+#
+# Views call enqueue() inside the transaction of the write, which only adds
+# an OutboxJob row; `manage.py run_outbox` carries the jobs out:
+#   - a batch is claimed with a conditional UPDATE (pending -> running, or a
+#     running job whose lease expired), so two workers never share a job;
+#   - jobs of one kind go to their handler together, e.g. all queued
+#     notifications of a batch are one bulk_create;
+#   - a handler runs in one transaction with the deletion of its jobs, so a
+#     job either happens and disappears or neither;
+#   - a failing job is retried after OUTBOX_RETRY_BASE * 2**(attempts - 1)
+#     seconds (jittered, capped at OUTBOX_RETRY_MAX) and marked failed after
+#     OUTBOX_MAX_ATTEMPTS. Failed jobs stay in the table for inspection.
+import logging
+import os
+import random
+import socket
+import traceback
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification, OutboxJob
+from .notifications import notifications_created
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}  # kind -> fn(list of payloads)
+
+
+def handler(kind):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def _setting(name, default):
+    return getattr(settings, f'OUTBOX_{name}', default)
+
+
+# -------------------------
+# Enqueueing (request side)
+# -------------------------
+def enqueue(kind, payload):
+    """Queue a side effect. Call inside the transaction of the write it
+    belongs to, so it's only queued if that write commits."""
+    job = OutboxJob.objects.create(kind=kind, payload=payload)
+    if _setting('EAGER', False):
+        # no worker (local development): run right after the commit
+        transaction.on_commit(run_pending)
+    return job
+
+
+def enqueue_notifications(*notifications):
+    """Queue Notification rows, given as dicts of field values
+    (user_id, actor_user_id, type, text, data), as one job."""
+    return enqueue('notifications', {'notifications': list(notifications)})
+
+
+@handler('notifications')
+def create_notifications(payloads):
+    notifs = Notification.objects.bulk_create([
+        Notification(**fields) for payload in payloads for fields in payload['notifications']
+    ])
+    notifications_created(notifs)  # bulk_create skips post_save
+
+
+# -------------------------
+# Worker side
+# -------------------------
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'[:64]
+
+
+def claim(batch_size, worker, lease):
+    now = timezone.now()
+    claimable = (Q(status=OutboxJob.STATUS_PENDING, run_after__lte=now)
+                 | Q(status=OutboxJob.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=lease)))
+    ids = list(OutboxJob.objects.filter(claimable).order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    # whoever's UPDATE matches a row owns it; the rest see it already taken
+    OutboxJob.objects.filter(claimable, id__in=ids).update(
+        status=OutboxJob.STATUS_RUNNING, locked_by=worker, locked_at=now)
+    return list(OutboxJob.objects.filter(id__in=ids, locked_by=worker, locked_at=now).order_by('id'))
+
+
+def run_batch(batch_size=None, worker=None):
+    """Claim and run one batch. Returns the number of jobs claimed."""
+    jobs = claim(batch_size or _setting('BATCH_SIZE', 100), worker or worker_name(), _setting('LEASE', 300))
+    by_kind = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job)
+    for kind, group in by_kind.items():
+        fn = HANDLERS.get(kind)
+        if fn is None:
+            for job in group:
+                _retry(job, f'no handler registered for {kind!r}', final=True)
+        elif not _run(fn, group) and len(group) > 1:
+            # find the job that broke the batch; the others still go through
+            for job in group:
+                _run(fn, [job])
+    return len(jobs)
+
+
+def run_pending(batch_size=None):
+    """Run every job that is due now (used by tests and OUTBOX_EAGER)."""
+    total = 0
+    while True:
+        n = run_batch(batch_size)
+        if not n:
+            return total
+        total += n
+
+
+def _run(fn, jobs):
+    try:
+        with transaction.atomic():
+            fn([job.payload for job in jobs])
+            OutboxJob.objects.filter(id__in=[job.id for job in jobs]).delete()
+        return True
+    except Exception:
+        if len(jobs) == 1:
+            logger.exception('outbox job %s (%s) failed', jobs[0].id, jobs[0].kind)
+            _retry(jobs[0], traceback.format_exc())
+        return False
+
+
+def _retry(job, error, final=False):
+    attempts = job.attempts + 1
+    if final or attempts >= _setting('MAX_ATTEMPTS', 8):
+        status, delay = OutboxJob.STATUS_FAILED, 0
+    else:
+        delay = min(_setting('RETRY_BASE', 2) * 2 ** (attempts - 1), _setting('RETRY_MAX', 600))
+        status, delay = OutboxJob.STATUS_PENDING, delay * random.uniform(0.5, 1.0)
+    OutboxJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status=status, attempts=attempts, last_error=error[-4000:],
+        run_after=timezone.now() + timedelta(seconds=delay), locked_by='', locked_at=None,
+    )
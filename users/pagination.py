@@ -0,0 +1,136 @@
+# backend/users/pagination.py
+import base64
+import random
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import FEED_KEY_SPACE
+
+
+class SeededFeedPagination(BasePagination):
+    """
+    Keyset pagination over User.feed_key for the unfiltered discovery feed.
+
+    Every user gets a random feed_key once (at creation). A client session
+    picks a seed; the feed walks users in feed_key order starting at the
+    seed and wrapping around to the start, so:
+      - different sessions start at different points of the shuffle,
+      - pages stay stable while scrolling (no re-shuffle per request),
+      - each page is one indexed range scan of page_size rows.
+
+    The cursor is (phase, feed_key, id) of the last row served:
+      phase 0 = feed_key >= seed, phase 1 = wrapped part (feed_key < seed).
+    """
+    page_size = 20
+    max_page_size = 50
+    page_size_query_param = 'page_size'
+    seed_query_param = 'seed'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # next links point here when set (pages served outside /api/users/)
+    base_url = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.seed = self.get_seed(request)
+        self.size = self.get_page_size(request)
+        phase, key, pk = self.decode_cursor(request)
+
+        rows = self._take(queryset, phase, key, pk, self.size + 1)
+        if phase == 0 and len(rows) <= self.size:
+            # ran off the end of the key space: continue from the start
+            rows += self._take(queryset, 1, -1, 0, self.size + 1 - len(rows))
+
+        self.has_next = len(rows) > self.size
+        rows = rows[:self.size]
+        self.last = rows[-1] if rows else None
+        return [user for _, user in rows]
+
+    def _take(self, queryset, phase, key, pk, limit):
+        qs = queryset.order_by('feed_key', 'id')
+        if phase == 0:
+            qs = qs.filter(feed_key__gte=self.seed)
+        else:
+            qs = qs.filter(feed_key__lt=self.seed)
+        # strictly after the cursor row
+        qs = qs.filter(feed_key__gte=key).exclude(feed_key=key, id__lte=pk)
+        return [(phase, user) for user in qs[:limit]]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'seed': self.seed,
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'seed': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # -------------------------
+    # params / cursor encoding
+    # -------------------------
+    def get_seed(self, request):
+        try:
+            seed = int(request.query_params[self.seed_query_param])
+            if 0 <= seed < FEED_KEY_SPACE:
+                return seed
+        except (KeyError, ValueError):
+            pass
+        return random.randrange(FEED_KEY_SPACE)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return 0, -1, 0
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            phase, key, pk = (int(x) for x in raw.split('.'))
+            if phase not in (0, 1):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return phase, key, pk
+
+    def encode_cursor(self, phase, key, pk):
+        raw = f'{phase}.{key}.{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        phase, user = self.last
+        url = self.base_url or self.request.build_absolute_uri()
+        url = replace_query_param(url, self.seed_query_param, self.seed)
+        url = replace_query_param(url, self.cursor_query_param,
+                                  self.encode_cursor(phase, user.feed_key, user.id))
+        return url
+
+    def get_previous_link(self):
+        return None
+
+
+class FilteredResultsPagination(LimitOffsetPagination):
+    """Limit/offset pages over the id list of a filtered /api/users/ query
+    (see UsersListView.get_result_ids)."""
+    default_limit = 20
+    max_limit = 50
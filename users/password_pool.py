@@ -0,0 +1,52 @@
+# backend/users/password_pool.py
+# Process pool for make_password, used by bulk signup (users/bulk_signup.py).
+# Kept free of model imports: spawned workers import this module before
+# Django is set up (see _init_worker).
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+def _init_worker(settings_module):
+    # spawned workers start without Django configured
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def hash_pool(workers):
+    """Process pool for make_password. 'spawn' so it is safe to start from a
+    threaded server process."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),),
+    )
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_hash_pool():
+    """Long-lived pool for BatchSignupView (None when disabled in settings)."""
+    global _shared_pool
+    workers = getattr(settings, 'BULK_SIGNUP_HASH_WORKERS', 4)
+    if not workers:
+        return None
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = hash_pool(workers)
+    return _shared_pool
+
+
+def hash_passwords(passwords, executor=None):
+    if executor is None or len(passwords) < 2:
+        return [make_password(p) for p in passwords]
+    return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 32)))
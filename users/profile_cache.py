@@ -0,0 +1,50 @@
+# backend/users/profile_cache.py
+# Shared cache of the {"id", "full_name", "avatar_url"} mini-profiles embedded
+# as from_user / to_user / friend / actor in list responses.
+#
+# A page looks up all of its user ids with one cache get_many; misses are
+# filled with one in_bulk query and written back with set_many. Entries are
+# dropped when the User is saved or deleted (users/signals.py).
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+User = get_user_model()
+
+KEY_PREFIX = 'mini-profile:'
+
+
+def _cache():
+    return caches[getattr(settings, 'PROFILE_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def mini_profile(user):
+    # small embed used for from_user / to_user / friend / actor
+    return {"id": user.id, "full_name": getattr(user, 'full_name', ''), "avatar_url": getattr(user, 'avatar_url', '')}
+
+
+def get_mini_profiles(user_ids):
+    """{user_id: mini-profile} for the given ids (unknown ids are left out)."""
+    ids = {uid for uid in user_ids if uid is not None}
+    if not ids:
+        return {}
+    cache = _cache()
+    cached = cache.get_many([_key(uid) for uid in ids])
+    profiles = {p['id']: p for p in cached.values()}
+
+    missing = ids - profiles.keys()
+    if missing:
+        users = User.objects.only('id', 'full_name', 'avatar_url').in_bulk(missing)
+        fresh = {uid: mini_profile(u) for uid, u in users.items()}
+        cache.set_many({_key(uid): p for uid, p in fresh.items()},
+                       timeout=getattr(settings, 'PROFILE_CACHE_TIMEOUT', 300))
+        profiles.update(fresh)
+    return profiles
+
+
+def invalidate(user_id):
+    _cache().delete(_key(user_id))
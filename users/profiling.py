@@ -0,0 +1,75 @@
+# backend/users/profiling.py
+# On-demand cProfile captures of single requests (see ProfilingMiddleware in
+# users/middleware.py). Captures are pstats files in PROFILE_CAPTURE_DIR; only
+# the newest PROFILE_CAPTURE_KEEP are kept. Listed / downloaded from
+# /admin/profiles/ (users/admin.py).
+import cProfile
+import io
+import itertools
+import pstats
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+SUFFIX = '.prof'
+_SAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+_seq = itertools.count()
+
+
+def capture_dir():
+    return Path(getattr(settings, 'PROFILE_CAPTURE_DIR', settings.BASE_DIR / 'var' / 'profiles'))
+
+
+def run_profiled(func, *args):
+    """Call func(*args) under cProfile; returns (result, profiler)."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+    return result, profiler
+
+
+def save_capture(profiler, route, seconds):
+    """Write the stats and drop captures beyond the retention limit.
+    Returns the capture name."""
+    directory = capture_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    name = f'{stamp}-{next(_seq) % 10000:04d}-{_SAFE.sub("_", route)}-{seconds * 1000:.0f}ms{SUFFIX}'
+    profiler.dump_stats(directory / name)
+    _rotate(directory)
+    return name
+
+
+def _rotate(directory):
+    keep = getattr(settings, 'PROFILE_CAPTURE_KEEP', 50)
+    files = sorted(directory.glob(f'*{SUFFIX}'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[keep:]:
+        old.unlink(missing_ok=True)
+
+
+def list_captures():
+    """[{name, size, modified}, ...] newest first."""
+    directory = capture_dir()
+    if not directory.is_dir():
+        return []
+    rows = []
+    for path in directory.glob(f'*{SUFFIX}'):
+        stat = path.stat()
+        rows.append({'name': path.name, 'size': stat.st_size, 'modified': stat.st_mtime})
+    rows.sort(key=lambda r: r['modified'], reverse=True)
+    return rows
+
+
+def capture_path(name):
+    """Path of a capture by name, or None (no traversal outside the directory)."""
+    if _SAFE.sub('', name) != name or not name.endswith(SUFFIX):
+        return None
+    path = capture_dir() / name
+    return path if path.is_file() else None
+
+
+def capture_summary(path, sort='cumulative', limit=60):
+    out = io.StringIO()
+    pstats.Stats(str(path), stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,104 @@
+# backend/users/read_serializers.py
+# Read-only list serializers for the hottest list endpoints (/api/users/,
+# /api/friends/, /api/notifications/).
+#
+# Each produces exactly the payload of its ModelSerializer counterpart in
+# users/serializers.py (users/tests.py compares them), but builds items
+# straight from values_list() tuples: no model instances, no per-field
+# to_representation calls. `manage.py bench_serializers` reports the
+# per-item cost of both.
+#
+# They accept the arguments generic views pass to serializer_class
+# (instance, many=True, context=...) and expose .data; they can't validate
+# or save, and only serialize lists.
+from django.db.models.query import QuerySet
+from rest_framework import serializers
+
+from .profile_cache import get_mini_profiles
+from .relationships import relationships
+from .serializers import UserSerializer
+
+# formats like the ModelSerializers' DateTimeField (current timezone, "Z")
+_datetime = serializers.DateTimeField()
+
+
+def _dt(value):
+    return None if value is None else _datetime.to_representation(value)
+
+
+class ValuesListSerializer:
+    fields = ()  # values_list() columns, in row order
+
+    def __init__(self, instance=None, data=serializers.empty, many=True, context=None, **kwargs):
+        self.instance = instance
+        self.context = context if context is not None else {}
+
+    @classmethod
+    def values(cls, queryset, *extra, named=False):
+        """queryset as rows this serializer reads; extra columns go last."""
+        return queryset.values_list(*cls.fields, *extra, named=named)
+
+    @property
+    def data(self):
+        rows = self.instance
+        if isinstance(rows, QuerySet):
+            rows = self.values(rows)
+        return self.to_representation(list(rows))
+
+    def to_representation(self, rows):
+        raise NotImplementedError
+
+    def profiles(self, user_ids):
+        # same context["profiles"] contract as MiniProfileListSerializer
+        profiles = self.context.setdefault('profiles', {})
+        missing = set(user_ids) - profiles.keys()
+        if missing:
+            profiles.update(get_mini_profiles(missing))
+        return profiles
+
+
+class FeedUserReadSerializer(ValuesListSerializer):
+    """FeedUserSerializer for /api/users/ pages."""
+    fields = UserSerializer.Meta.fields
+
+    def to_representation(self, rows):
+        fields = self.fields
+        known = self.context.setdefault('relationships', {})
+        missing = [row[0] for row in rows if row[0] not in known]
+        if missing:
+            request = self.context.get('request')
+            known.update(relationships(getattr(request, 'user', None), missing))
+        items = []
+        for row in rows:
+            item = dict(zip(fields, row))  # ignores extra trailing columns
+            item['relationship'] = known[row[0]]
+            items.append(item)
+        return items
+
+
+class FriendshipReadSerializer(ValuesListSerializer):
+    """FriendshipSerializer for /api/friends/."""
+    fields = ('id', 'user1_id', 'user2_id', 'created_at')
+
+    def to_representation(self, rows):
+        me = self.context['request'].user.id
+        friend_ids = [b if a == me else a for _, a, b, _ in rows]
+        profiles = self.profiles(friend_ids)
+        return [
+            {'id': pk, 'friend': profiles.get(friend_id), 'created_at': _dt(created_at)}
+            for (pk, _, _, created_at), friend_id in zip(rows, friend_ids)
+        ]
+
+
+class NotificationReadSerializer(ValuesListSerializer):
+    """NotificationSerializer for /api/notifications/."""
+    fields = ('id', 'type', 'text', 'data', 'is_read', 'actor_user_id', 'created_at')
+
+    def to_representation(self, rows):
+        profiles = self.profiles(row[5] for row in rows if row[5] is not None)
+        return [
+            {'id': pk, 'type': type_, 'text': text, 'data': data, 'is_read': is_read,
+             'actor': profiles.get(actor_id) if actor_id is not None else None,
+             'created_at': _dt(created_at)}
+            for pk, type_, text, data, is_read, actor_id, created_at in rows
+        ]
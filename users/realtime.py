@@ -0,0 +1,188 @@
+# backend/users/realtime.py
+# In-process pub/sub used to push new notifications to open streams
+# (GET /api/notifications/stream/, see users/stream_views.py).
+#
+# The backend is pluggable: settings.NOTIFICATION_BROKER is a dotted path to a
+# BaseBroker subclass. InMemoryBroker only reaches streams served by the same
+# process; DatabasePollingBroker also picks up rows written by other processes
+# (the outbox worker) by polling the Notification table. A multi-process
+# deployment can plug in a shared backend exposing the same
+# subscribe/unsubscribe/publish interface.
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Max
+from django.utils.module_loading import import_string
+
+from .db_router import read_only_db
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One open stream. Messages are delivered into an asyncio queue owned by
+    the event loop the stream runs on."""
+
+    def __init__(self, user_id, loop, maxsize=100):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # set when the queue overflowed and messages were dropped; the stream
+        # then closes so the client reconnects and replays from Last-Event-ID
+        self.overflowed = False
+
+    def offer(self, message):
+        # runs on self.loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class BaseBroker:
+    def subscribe(self, user_id, after_id=None):
+        """Must be called from the event loop that will read the subscription.
+        after_id is the newest notification id when the caller started
+        listening; brokers that read the table deliver every row after it."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, user_id, message):
+        """Thread-safe; may be called from sync request threads."""
+        raise NotImplementedError
+
+
+class InMemoryBroker(BaseBroker):
+
+    def __init__(self):
+        self._subs = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, after_id=None):
+        sub = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subs[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subs = self._subs.get(subscription.user_id)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subs[subscription.user_id]
+
+    def publish(self, user_id, message):
+        with self._lock:
+            subs = list(self._subs.get(user_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, message)
+            except RuntimeError:
+                # loop already closed; the stream is gone
+                self.unsubscribe(sub)
+
+    def subscriber_count(self, user_id):
+        with self._lock:
+            return len(self._subs.get(user_id, ()))
+
+
+class DatabasePollingBroker(InMemoryBroker):
+    """InMemoryBroker fed from the Notification table instead of publish().
+
+    Notifications are inserted by the outbox worker (`manage.py run_outbox`),
+    a different process, so publish() calls there can't reach this process's
+    streams. While anyone is subscribed, one daemon thread per process reads
+    the rows newer than the last one it saw every
+    NOTIFICATION_POLL_INTERVAL seconds and hands them to local subscribers,
+    in id order. (With SQLite's single writer, id order is commit order.)
+    A poller that starts for a new subscriber begins at the after_id the
+    subscriber passed, so nothing committed since it started listening is
+    lost."""
+
+    batch_size = 500
+
+    def __init__(self):
+        super().__init__()
+        self.interval = getattr(settings, 'NOTIFICATION_POLL_INTERVAL', 1.0)
+        self._last_id = None
+        self._thread = None
+
+    def subscribe(self, user_id, after_id=None):
+        sub = super().subscribe(user_id)
+        with self._lock:
+            if self._thread is None:
+                # start from the caller's mark, not from whatever is newest
+                # when the thread first polls: rows committed in between
+                # would be skipped. A running poller has seen everything up
+                # to _last_id already and the rest is still ahead of it.
+                self._last_id = after_id
+                self._thread = threading.Thread(target=self._run, name='notification-poller', daemon=True)
+                self._thread.start()
+        return sub
+
+    def publish(self, user_id, message):
+        pass  # delivered by the poller, so local and worker rows keep id order
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    if not self._subs:
+                        # nobody listened in between: the next poller starts from "now"
+                        self._thread, self._last_id = None, None
+                        return
+                try:
+                    self.poll()
+                except Exception:
+                    logger.exception('notification poll failed')
+                close_old_connections()
+                time.sleep(self.interval)
+        finally:
+            connections.close_all()  # this thread's connections
+
+    def poll(self):
+        """Deliver notifications created since the last poll; returns how many.
+        Without a mark from subscribe() the first poll only records one."""
+        from .notifications import notification_event  # imports this module
+
+        with read_only_db():
+            if self._last_id is None:
+                self._last_id = Notification.objects.aggregate(m=Max('id'))['m'] or 0
+                return 0
+            rows = list(Notification.objects.filter(id__gt=self._last_id).order_by('id')[:self.batch_size])
+        if rows:
+            self._last_id = rows[-1].pk
+        with self._lock:
+            listening = set(self._subs)
+        delivered = 0
+        for n in rows:
+            if n.user_id in listening:
+                super().publish(n.user_id, (n.pk, notification_event(n)))
+                delivered += 1
+        return delivered
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'NOTIFICATION_BROKER', 'users.realtime.InMemoryBroker')
+                _broker = import_string(path)()
+    return _broker
@@ -0,0 +1,232 @@
+# backend/users/recommend.py
+# Skill-exchange recommendations: rank users by how much of what I want to
+# learn they know.
+#
+# Every active user is a sparse row over a shared skill vocabulary (and one
+# over languages). A request scores the whole user base with one sparse
+# matrix-vector product:
+#
+#     score = S @ (idf * want)          S: users x skills (0/1)
+#     score *= 1 if we share a language else LANGUAGE_PENALTY
+#
+# `want` is the skills asked for (?want=), or by default every skill I don't
+# have. idf down-weights skills everybody lists.
+#
+# The matrix is built from the DB and then kept in memory. Profile changes
+# made in this process (post_save, users/signals.py) only touch that user's
+# row: changed rows are scored separately until enough pile up to be worth a
+# rebuild, which runs from the in-memory rows, never by re-reading User.
+# Other processes' writes (imports, seeding, other web workers) are picked
+# up by a periodic full reload (settings.SKILL_MATRIX_TTL seconds).
+import heapq
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .skill_index import normalize_tags
+
+# NumPy/SciPy are optional: without them scoring falls back to plain Python
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+    sparse = None
+
+LANGUAGE_PENALTY = 0.5
+
+User = get_user_model()
+
+
+class SkillMatrix:
+
+    # changed rows tolerated before the sparse matrices are rebuilt
+    compact_threshold = 1000
+
+    def __init__(self, ttl=None):
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self.ttl = ttl
+        self.skill_vocab = {}   # normalized skill -> column
+        self.lang_vocab = {}    # normalized language -> column
+        self._rows = {}         # user_id -> (skill cols, language cols)
+        self._df = []           # users per skill column
+        # sparse snapshot of _rows (NumPy path)
+        self._base_ids = None
+        self._base_pos = {}
+        self._S = None
+        self._L = None
+        self._delta = set()     # user ids changed since the snapshot
+
+    # -------------------------
+    # building / incremental updates
+    # -------------------------
+    def load(self):
+        with self._lock:
+            self.skill_vocab, self.lang_vocab, self._rows, self._df = {}, {}, {}, []
+            rows = (User.objects.filter(is_active=True)
+                    .values_list('id', 'skills', 'languages').order_by().iterator(chunk_size=5000))
+            for user_id, skills, languages in rows:
+                self._set_row(user_id, skills, languages)
+            self._compact()
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        stale = (
+            self._loaded_at is None
+            or (self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl)
+        )
+        if stale:
+            self.load()
+
+    def _cols(self, vocab, values, df=None):
+        cols = []
+        for name in normalize_tags(values):
+            col = vocab.get(name)
+            if col is None:
+                col = vocab[name] = len(vocab)
+                if df is not None:
+                    df.append(0)
+            cols.append(col)
+        return tuple(sorted(cols))
+
+    def _set_row(self, user_id, skills, languages):
+        self._drop_row(user_id)
+        skill_cols = self._cols(self.skill_vocab, skills, self._df)
+        for c in skill_cols:
+            self._df[c] += 1
+        self._rows[user_id] = (skill_cols, self._cols(self.lang_vocab, languages))
+
+    def _drop_row(self, user_id):
+        old = self._rows.pop(user_id, None)
+        if old is not None:
+            for c in old[0]:
+                self._df[c] -= 1
+
+    def update_user(self, user_id, skills, languages, is_active=True):
+        with self._lock:
+            if self._loaded_at is None:
+                return  # picked up by the first load
+            if is_active:
+                self._set_row(user_id, skills, languages)
+            else:
+                self._drop_row(user_id)
+            self._delta.add(user_id)
+            if len(self._delta) > self.compact_threshold:
+                self._compact()
+
+    def remove_user(self, user_id):
+        self.update_user(user_id, None, None, is_active=False)
+
+    def _compact(self):
+        self._delta = set()
+        if np is None:
+            return
+        ids = np.fromiter(self._rows.keys(), dtype=np.int64, count=len(self._rows))
+        self._S = self._to_csr([self._rows[i][0] for i in ids.tolist()], len(self.skill_vocab))
+        self._L = self._to_csr([self._rows[i][1] for i in ids.tolist()], len(self.lang_vocab))
+        self._base_ids = ids
+        self._base_pos = {uid: pos for pos, uid in enumerate(ids.tolist())}
+
+    @staticmethod
+    def _to_csr(col_lists, n_cols):
+        indptr = np.zeros(len(col_lists) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(c) for c in col_lists])
+        indices = np.fromiter((c for cols in col_lists for c in cols), dtype=np.int32, count=int(indptr[-1]))
+        data = np.ones(len(indices), dtype=np.float64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(col_lists), max(n_cols, 1)))
+
+    # -------------------------
+    # scoring
+    # -------------------------
+    def _weights(self, my_skills, want):
+        """idf-weighted want vector as {column: weight}."""
+        n = max(len(self._rows), 1)
+        if want:
+            cols = {self.skill_vocab[t] for t in normalize_tags(want) if t in self.skill_vocab}
+        else:
+            mine = {self.skill_vocab.get(t) for t in normalize_tags(my_skills)}
+            cols = {c for c in range(len(self.skill_vocab)) if c not in mine}
+        return {c: math.log((1 + n) / (1 + self._df[c])) + 1.0 for c in cols if self._df[c] > 0}
+
+    def _score_row(self, row, weights, my_langs):
+        skill_cols, lang_cols = row
+        score = sum(weights.get(c, 0.0) for c in skill_cols)
+        if score and not (my_langs and my_langs.intersection(lang_cols)):
+            score *= LANGUAGE_PENALTY
+        return score
+
+    def recommend(self, user_id, my_skills, my_languages, want=None, k=20, exclude=()):
+        """Top-k [(user_id, score), ...] for a user, best first."""
+        self._ensure_loaded()
+        with self._lock:
+            weights = self._weights(my_skills, want)
+            if not weights:
+                return []
+            my_langs = {self.lang_vocab[t] for t in normalize_tags(my_languages) if t in self.lang_vocab}
+            skip = set(exclude)
+            skip.add(user_id)
+
+            if np is None:
+                candidates = (
+                    (self._score_row(row, weights, my_langs), uid)
+                    for uid, row in self._rows.items() if uid not in skip
+                )
+                best = heapq.nlargest(k, (c for c in candidates if c[0] > 0))
+                return [(uid, score) for score, uid in best]
+
+            scores = self._score_base(weights, my_langs)
+            # rows changed since the snapshot are scored from the live rows
+            stale = [self._base_pos[u] for u in self._delta if u in self._base_pos]
+            stale += [self._base_pos[u] for u in skip if u in self._base_pos]
+            if stale:
+                scores[stale] = 0.0
+            extra = [
+                (self._score_row(self._rows[u], weights, my_langs), u)
+                for u in self._delta if u in self._rows and u not in skip
+            ]
+            top = self._top_k(scores, k)
+            merged = [(float(scores[p]), int(self._base_ids[p])) for p in top] + extra
+            best = heapq.nlargest(k, (c for c in merged if c[0] > 0))
+            return [(uid, score) for score, uid in best]
+
+    def _score_base(self, weights, my_langs):
+        n_cols = self._S.shape[1]
+        w = np.zeros(n_cols, dtype=np.float64)
+        for c, weight in weights.items():
+            if c < n_cols:  # newer columns only occur in delta rows
+                w[c] = weight
+        scores = self._S @ w
+        lang = np.zeros(self._L.shape[1], dtype=np.float64)
+        for c in my_langs:
+            if c < len(lang):
+                lang[c] = 1.0
+        shares_language = (self._L @ lang) > 0
+        return np.where(shares_language, scores, scores * LANGUAGE_PENALTY)
+
+    def _top_k(self, scores, k):
+        """Positions of the k best rows, ties broken by higher user id (same
+        order as the heapq merge of (score, uid) tuples)."""
+        if len(scores) > k:
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            cand = np.flatnonzero(scores >= kth)
+        else:
+            cand = np.arange(len(scores))
+        order = np.lexsort((-self._base_ids[cand], -scores[cand]))
+        return cand[order[:k]]
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def skill_matrix():
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                _matrix = SkillMatrix(ttl=getattr(settings, 'SKILL_MATRIX_TTL', 300))
+    return _matrix
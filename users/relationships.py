@@ -0,0 +1,51 @@
+# backend/users/relationships.py
+# How the requesting user relates to each user on a page of /api/users/, so
+# cards can show "Friends" / "Pending" instead of letting the client find
+# out from a failed POST /api/friends/request/.
+#
+# A whole page costs two set-based queries, whatever its size: one over
+# Friendship (user1 / user2 indexes) and one over pending FriendRequests in
+# either direction ((from_user, status) / (to_user, status) indexes).
+from django.db.models import Q
+
+from .models import FriendRequest, Friendship
+
+NONE = 'none'
+FRIENDS = 'friends'
+OUTGOING = 'outgoing_pending'
+INCOMING = 'incoming_pending'
+
+
+def relationships(user, user_ids):
+    """{user_id: relationship} for each of user_ids, as seen by `user`."""
+    user_ids = set(user_ids)
+    if not user_ids or user is None or not user.is_authenticated:
+        return dict.fromkeys(user_ids, NONE)
+
+    me = user.id
+    pairs = Friendship.objects.filter(
+        Q(user1_id=me, user2_id__in=user_ids) | Q(user2_id=me, user1_id__in=user_ids)
+    ).values_list('user1_id', 'user2_id')
+    pending = FriendRequest.objects.filter(
+        Q(from_user_id=me, to_user_id__in=user_ids) | Q(to_user_id=me, from_user_id__in=user_ids),
+        status=FriendRequest.STATUS_PENDING,
+    ).values_list('from_user_id', 'to_user_id')
+    return resolve(me, user_ids, pairs, pending)
+
+
+def resolve(me, user_ids, friendships, pending):
+    """Same as relationships() from rows already loaded: (user1_id, user2_id)
+    friendship pairs and (from_user_id, to_user_id) pending requests that
+    involve `me` (extra rows are ignored)."""
+    result = dict.fromkeys(user_ids, NONE)
+    for from_id, to_id in pending:
+        if from_id == me and to_id in result:
+            result[to_id] = OUTGOING
+        elif to_id == me and from_id in result:
+            result[from_id] = INCOMING
+    # a stale pending row can outlive the friendship it led to
+    for a, b in friendships:
+        other = b if a == me else a
+        if other in result:
+            result[other] = FRIENDS
+    return result
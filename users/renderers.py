@@ -0,0 +1,57 @@
+# backend/users/renderers.py
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import json
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson is optional: without it FastJSONRenderer is DRF's JSONRenderer
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that serializes with orjson when it is installed.
+
+    Output matches DRF's compact, unicode JSONRenderer byte for byte for the
+    data our serializers produce: U+2028 / U+2029 are escaped the same way
+    (raw they break JSON embedded in <script>), and anything orjson can't
+    handle natively (lazy strings, Decimal, ...) goes through DRF's encoder.
+    Indented output (browsable API, ; indent=) is left to JSONRenderer."""
+
+    _options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self._encoder.default, option=self._options)
+        except TypeError:
+            # e.g. ints past 64 bits, which the stdlib encoder handles
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class _ExportRenderer(BaseRenderer):
+    # Export views stream their own body (users/export.py); these renderers
+    # exist so ?format= / Accept negotiation knows the formats, and only
+    # render error payloads (e.g. a 403) as plain JSON.
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data).encode(self.charset)
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
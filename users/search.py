@@ -0,0 +1,63 @@
+# backend/users/search.py
+# Ranked people search backed by the users_user_fts FTS5 table
+# (DDL + triggers in users/fts.py).
+import re
+
+from django.db import connection, models
+
+from . import skill_index
+from .fts import FTS_TABLE
+
+# bm25 column weights: full_name, username, bio, skills
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 4.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_fts_ready = None
+
+
+def fts_available():
+    global _fts_ready
+    if _fts_ready is None:
+        if connection.vendor != 'sqlite':
+            _fts_ready = False
+        else:
+            _fts_ready = FTS_TABLE in connection.introspection.table_names()
+    return _fts_ready
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Each token is quoted so user input can't inject FTS operators.
+    Returns '' when the text has no searchable words.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    return ' '.join('"%s"*' % t.replace('"', '""') for t in tokens)
+
+
+def search_users(qs, text):
+    """Restrict qs to users matching text, ordered by relevance.
+
+    On SQLite the FTS table is joined into qs itself, so the MATCH, the
+    other filters on qs and the bm25 ordering all run in one statement.
+    """
+    if fts_available():
+        match = build_match_query(text)
+        if not match:
+            return qs.none()
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        return qs.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {qs.model._meta.db_table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+            order_by=['search_rank', '-id'],
+        )
+
+    # non-SQLite backends: substring match on name + skill index
+    return qs.filter(
+        models.Q(full_name__icontains=text)
+        | models.Q(full_name='', username__icontains=text)
+        | models.Q(id__in=skill_index.users_with_skill_containing(text))
+    )
@@ -59,6 +59,7 @@ class SignupSerializer(serializers.ModelSerializer):
 # backend/users/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from .relationships import relationships
 
 User = get_user_model()
 
@@ -81,55 +82,142 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "username", "email", "is_active")
 
 
+class FeedUserListSerializer(serializers.ListSerializer):
+    """Works out the viewer's relationship to every user on the page in two
+    queries (users/relationships.py) and passes it on via context["relationships"].
+    Entries the caller already put there are not looked up again."""
+
+    def to_representation(self, data):
+        items = list(data)
+        request = self.context.get('request')
+        known = self.context.setdefault('relationships', {})
+        missing = [u.id for u in items if u.id not in known]
+        if missing:
+            known.update(relationships(getattr(request, 'user', None), missing))
+        return super().to_representation(items)
+
+
+class FeedUserSerializer(UserSerializer):
+    # /api/users/ cards: "none" | "friends" | "outgoing_pending" | "incoming_pending"
+    relationship = serializers.SerializerMethodField()
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ("relationship",)
+        list_serializer_class = FeedUserListSerializer
+
+    def get_relationship(self, obj):
+        known = self.context.get('relationships')
+        if known is None or obj.id not in known:
+            request = self.context.get('request')
+            known = relationships(getattr(request, 'user', None), [obj.id])
+        return known[obj.id]
+
+
 # append to backend/users/serializers.py
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import FriendRequest, Friendship, Notification
+from django.db import models
+from .models import FriendRequest, Friendship, Notification, Message
+from .profile_cache import get_mini_profiles, mini_profile  # noqa: F401 (mini_profile used by views)
 
 User = get_user_model()
 
-class FriendRequestSerializer(serializers.ModelSerializer):
+
+class MiniProfileListSerializer(serializers.ListSerializer):
+    """Loads every mini-profile a page embeds in one batch (users/profile_cache.py)
+    and hands them to the rows through context["profiles"]."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        wanted = set()
+        for item in items:
+            wanted.update(self.child.profile_ids(item))
+        profiles = self.context.setdefault('profiles', {})
+        profiles.update(get_mini_profiles(wanted - profiles.keys()))
+        return super().to_representation(items)
+
+
+class MiniProfileMixin:
+    # rows only carry user ids; the embeds come from the profile cache
+
+    def profile_ids(self, obj):
+        raise NotImplementedError
+
+    def profile(self, user_id):
+        if user_id is None:
+            return None
+        profiles = self.context.get('profiles')
+        if profiles is None or user_id not in profiles:
+            profiles = get_mini_profiles([user_id])  # single-object serialization
+        return profiles.get(user_id)
+
+
+class FriendRequestSerializer(MiniProfileMixin, serializers.ModelSerializer):
     from_user = serializers.SerializerMethodField()
     to_user = serializers.SerializerMethodField()
 
     class Meta:
         model = FriendRequest
         fields = ('id','from_user','to_user','status','created_at')
+        list_serializer_class = MiniProfileListSerializer
+
+    def profile_ids(self, obj):
+        return (obj.from_user_id, obj.to_user_id)
 
     def get_from_user(self, obj):
-        return {"id": obj.from_user.id, "full_name": getattr(obj.from_user, 'full_name', ''), "avatar_url": getattr(obj.from_user,'avatar_url','')}
+        return self.profile(obj.from_user_id)
 
     def get_to_user(self, obj):
-        return {"id": obj.to_user.id, "full_name": getattr(obj.to_user, 'full_name', ''), "avatar_url": getattr(obj.to_user,'avatar_url','')}
+        return self.profile(obj.to_user_id)
 
 
-class FriendshipSerializer(serializers.ModelSerializer):
+class FriendshipSerializer(MiniProfileMixin, serializers.ModelSerializer):
     friend = serializers.SerializerMethodField()
     class Meta:
         model = Friendship
         fields = ("id","friend","created_at")
-    def get_friend(self, obj):
+        list_serializer_class = MiniProfileListSerializer
+
+    def _friend_id(self, obj):
         request_user = self.context.get('request').user
-        other = obj.user2 if obj.user1.id == request_user.id else obj.user1
-        return {"id": other.id, "full_name": getattr(other,'full_name',''), "avatar_url": getattr(other,'avatar_url','')}
+        return obj.user2_id if obj.user1_id == request_user.id else obj.user1_id
+
+    def profile_ids(self, obj):
+        return (self._friend_id(obj),)
 
+    def get_friend(self, obj):
+        return self.profile(self._friend_id(obj))
 
-class NotificationSerializer(serializers.ModelSerializer):
+
+class NotificationSerializer(MiniProfileMixin, serializers.ModelSerializer):
     actor = serializers.SerializerMethodField()
     class Meta:
         model = Notification
         fields = ("id","type","text","data","is_read","actor","created_at")
+        list_serializer_class = MiniProfileListSerializer
+
+    def profile_ids(self, obj):
+        return (obj.actor_user_id,)
 
     def get_actor(self, obj):
-        if not obj.actor_user:
-            return None
-        return {"id": obj.actor_user.id, "full_name": getattr(obj.actor_user,'full_name',''), "avatar_url": getattr(obj.actor_user,'avatar_url','')}
+        return self.profile(obj.actor_user_id)
 
-    
-    
-    
-    
-    
-    
-    
+
+class MessageSerializer(serializers.ModelSerializer):
+    # context["names"]: {user_id: display name} for the two participants
+    to = serializers.IntegerField(source='recipient_id', read_only=True)
+    from_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Message
+        fields = ("id", "from_name", "to", "text", "created_at")  # + "from", see get_fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # "from" is a Python keyword, so it can't be declared as an attribute
+        fields['from'] = serializers.IntegerField(source='sender_id', read_only=True)
+        return fields
+
+    def get_from_name(self, obj):
+        return self.context.get('names', {}).get(obj.sender_id, '')
@@ -0,0 +1,75 @@
+# backend/users/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+
+from . import profile_cache, skill_index
+from .authentication import user_cache
+from .feed_cache import feed_results
+from .models import Notification, Friendship
+from .graph import friend_graph
+from .recommend import skill_matrix
+from .notifications import add_unread, notifications_created
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # any change (password, is_active, profile) must reach authentication;
+    # again after commit so a concurrent request can't re-cache the old row
+    user_cache.invalidate(instance.id)
+    profile_cache.invalidate(instance.id)
+    transaction.on_commit(lambda: user_cache.invalidate(instance.id))
+    transaction.on_commit(lambda: profile_cache.invalidate(instance.id))
+
+    # saves that only touch e.g. last_login change no filter result
+    if update_fields is not None and not ({'skills', 'languages', 'age', 'is_active'} & set(update_fields)):
+        return
+    uid, skills, languages, age, active = (
+        instance.id, instance.skills, instance.languages, instance.age, instance.is_active)
+    feed_results.user_changed(uid, skills, languages, age, active)
+    transaction.on_commit(lambda: feed_results.user_changed(uid, skills, languages, age, active))
+
+    # age-only saves leave the skill index and matrix alone
+    if update_fields is not None and not ({'skills', 'languages', 'is_active'} & set(update_fields)):
+        return
+    skill_index.sync_user(instance)
+
+    transaction.on_commit(lambda: skill_matrix().update_user(uid, skills, languages, active))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    user_cache.invalidate(instance.id)
+    profile_cache.invalidate(instance.id)
+    feed_results.user_removed(instance.id)
+    uid = instance.id
+    transaction.on_commit(lambda: skill_matrix().remove_user(uid))
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    if created:
+        notifications_created([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    # queryset.delete() and cascades send this per row too
+    if not instance.is_read:
+        add_unread(instance.user_id, -1)
+
+
+@receiver(post_save, sender=Friendship)
+def friendship_saved(sender, instance, created, **kwargs):
+    if created:
+        a, b = instance.user1_id, instance.user2_id
+        transaction.on_commit(lambda: friend_graph().add_edge(a, b))
+
+
+@receiver(post_delete, sender=Friendship)
+def friendship_deleted(sender, instance, **kwargs):
+    a, b = instance.user1_id, instance.user2_id
+    transaction.on_commit(lambda: friend_graph().remove_edge(a, b))
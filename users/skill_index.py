@@ -0,0 +1,111 @@
+# backend/users/skill_index.py
+# Keeps the normalized Skill/Language tables in sync with the JSON fields on
+# User and builds the indexed subqueries UsersListView filters with.
+#
+# Matching rule for the ?skills= and ?lang= filters: a term matches a whole
+# tag, compared after normalize_tag() (trimmed, lower-cased), so "python"
+# finds "Python" but "py" does not. feed_cache.matches() applies the same
+# rule in Python. Only the free-text search fallback matches inside tags.
+from django.db.models import Q
+
+from .models import Skill, Language, UserSkill, UserLanguage
+
+
+def normalize_tag(value):
+    return str(value).strip().lower()
+
+
+def normalize_tags(values):
+    # keep first-seen order, drop blanks / duplicates
+    if isinstance(values, str):
+        values = [values]
+    seen = []
+    for v in (values or []):
+        n = normalize_tag(v)
+        if n and n not in seen:
+            seen.append(n)
+    return seen
+
+
+def _get_or_create_tags(model, names):
+    """Return {name: id} for names, inserting the missing ones in one statement."""
+    if not names:
+        return {}
+    existing = dict(model.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = [n for n in names if n not in existing]
+    if missing:
+        model.objects.bulk_create([model(name=n) for n in missing], ignore_conflicts=True)
+        existing.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+    return existing
+
+
+def _sync_links(link_model, tag_model, tag_field, users, values_for):
+    user_ids = [u.id for u in users]
+    wanted = {u.id: normalize_tags(values_for(u)) for u in users}
+    all_names = sorted({n for names in wanted.values() for n in names})
+    name_to_id = _get_or_create_tags(tag_model, all_names)
+
+    current = {}
+    for user_id, tag_id in link_model.objects.filter(user_id__in=user_ids).values_list('user_id', f'{tag_field}_id'):
+        current.setdefault(user_id, set()).add(tag_id)
+
+    to_add = []
+    to_remove = Q()
+    has_remove = False
+    for user_id, names in wanted.items():
+        target = {name_to_id[n] for n in names}
+        have = current.get(user_id, set())
+        for tag_id in target - have:
+            to_add.append(link_model(user_id=user_id, **{f'{tag_field}_id': tag_id}))
+        stale = have - target
+        if stale:
+            to_remove |= Q(user_id=user_id, **{f'{tag_field}_id__in': stale})
+            has_remove = True
+
+    if has_remove:
+        link_model.objects.filter(to_remove).delete()
+    if to_add:
+        link_model.objects.bulk_create(to_add, ignore_conflicts=True)
+
+
+def sync_users(users):
+    """Mirror users' JSON skills/languages into the link tables.
+
+    Works on any number of users with a fixed number of queries, so bulk
+    imports / seeding can call it once per chunk.
+    """
+    users = [u for u in users if u.id is not None]
+    if not users:
+        return
+    _sync_links(UserSkill, Skill, 'skill', users, lambda u: u.skills)
+    _sync_links(UserLanguage, Language, 'language', users, lambda u: u.languages)
+
+
+def sync_user(user):
+    sync_users([user])
+
+
+# -------------------------
+# Query helpers (return id subqueries so callers can do qs.filter(id__in=...))
+# -------------------------
+def users_with_any_skill(terms):
+    """Users having any of the skills in terms."""
+    names = normalize_tags(terms)
+    if not names:
+        return UserSkill.objects.none().values('user_id')
+    return UserSkill.objects.filter(skill__name__in=names).values('user_id')
+
+
+def users_with_language(lang):
+    """Users speaking lang."""
+    return UserLanguage.objects.filter(language__name=normalize_tag(lang)).values('user_id')
+
+
+def users_with_skill_containing(text):
+    """Users having a skill whose name contains text (free-text search
+    fallback). The LIKE runs over the small skill vocabulary; users are
+    then reached through the (skill, user) index."""
+    text = normalize_tag(text)
+    if not text:
+        return UserSkill.objects.none().values('user_id')
+    return UserSkill.objects.filter(skill__in=Skill.objects.filter(name__contains=text)).values('user_id')
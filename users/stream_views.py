@@ -0,0 +1,102 @@
+# backend/users/stream_views.py
+# GET /api/notifications/stream/  -> Server-Sent Events feed of new notifications
+#
+# Needs an ASGI server (e.g. `uvicorn config.asgi:application`); under WSGI
+# (`manage.py runserver`) the view answers 204 so EventSource stops and the
+# page falls back to polling /api/notifications/.
+#
+# EventSource can't set headers, so the access token may also be passed as
+# ?token=. On reconnect the browser sends Last-Event-ID and anything created
+# in between is replayed from the database before live events resume.
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import CachedJWTAuthentication
+from .models import Notification
+from .notifications import notification_event
+from .realtime import get_broker
+
+
+def _authenticate(request):
+    auth = CachedJWTAuthentication()
+    raw = None
+    header = auth.get_header(request)
+    if header is not None:
+        raw = auth.get_raw_token(header)
+    if raw is None:
+        raw = request.GET.get('token')
+    if not raw:
+        return None
+    try:
+        token = auth.get_validated_token(raw)
+        return auth.get_user(token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def _latest_id():
+    return Notification.objects.aggregate(m=Max('id'))['m'] or 0
+
+
+def _missed_events(user_id, after_id, limit=50):
+    rows = Notification.objects.filter(user_id=user_id, id__gt=after_id).order_by('id')[:limit]
+    return [(n.pk, notification_event(n)) for n in rows]
+
+
+def _sse(event_id, data):
+    return f"id: {event_id}\nevent: notification\ndata: {data}\n\n"
+
+
+async def _event_stream(user_id, last_id):
+    broker = get_broker()
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+    # newest id before subscribing: a polling broker delivers everything
+    # after it; subscribe before replaying so nothing falls in the gap
+    mark = await sync_to_async(_latest_id)()
+    sub = broker.subscribe(user_id, after_id=mark)
+    try:
+        yield "retry: 5000\n\n"
+        if last_id is not None:
+            for event_id, data in await sync_to_async(_missed_events)(user_id, last_id):
+                last_id = event_id
+                yield _sse(event_id, data)
+        while not sub.overflowed:
+            try:
+                event_id, data = await sub.get(heartbeat)
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            if last_id is not None and event_id <= last_id:
+                continue  # already replayed
+            last_id = event_id
+            yield _sse(event_id, data)
+    finally:
+        broker.unsubscribe(sub)
+
+
+async def notification_stream(request):
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+
+    response = StreamingHttpResponse(_event_stream(user.id, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # disable proxy buffering (nginx)
+    return response
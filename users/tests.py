@@ -0,0 +1,1012 @@
+# backend/users/tests.py
+# Tests for the users app, one TestCase per feature, in the order the
+# features were added. Many assert a fixed query count: fixtures are seeded
+# with bulk_create so a per-row (N+1) lookup shows up as a large, obvious
+# overshoot. Run with: python manage.py test users
+import asyncio
+import io
+import json
+import math
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import (
+    FriendRequest, Friendship, Message, Notification, NotificationCounter, OutboxJob, UserLanguage, UserSkill,
+)
+from . import outbox, password_pool
+from .feed_cache import feed_results
+from .db_router import read_only_db
+from .graph import FriendGraph
+from .metrics import registry as metrics_registry
+from .notifications import get_unread
+from .realtime import DatabasePollingBroker, InMemoryBroker
+from .recommend import SkillMatrix
+from .views import BootstrapView
+
+User = get_user_model()
+
+N_USERS = 60
+
+
+class SkillIndexTests(APITestCase):
+
+    def setUp(self):
+        feed_results.clear()
+        self.py = User.objects.create(username='py', email='py@example.com', skills=['Python', ' python ', 'Go'],
+                                      languages=['English'])
+        self.js = User.objects.create(username='js', email='js@example.com', skills=['JavaScript'],
+                                      languages=['english', 'Hindi'])
+
+    def tags(self, user):
+        return (sorted(UserSkill.objects.filter(user=user).values_list('skill__name', flat=True)),
+                sorted(UserLanguage.objects.filter(user=user).values_list('language__name', flat=True)))
+
+    def result_ids(self, **params):
+        return {row['id'] for row in self.client.get(reverse('api-users'), params).data['results']}
+
+    def test_save_syncs_normalized_tags(self):
+        self.assertEqual(self.tags(self.py), (['go', 'python'], ['english']))
+        self.py.skills = ['Go', 'Rust']
+        self.py.languages = []
+        self.py.save()
+        self.assertEqual(self.tags(self.py), (['go', 'rust'], []))
+
+    def test_bulk_hook_indexes_a_chunk_in_fixed_queries(self):
+        from . import bulk
+
+        def create(n, start):
+            return User.objects.bulk_create([
+                User(username=f'b{i}', email=f'b{i}@example.com', skills=[f'Skill{i}', 'Shared'],
+                     languages=['Tamil', f'Dialect{i}'])
+                for i in range(start, start + n)
+            ])
+
+        with CaptureQueriesContext(connection) as small:
+            bulk.users_created(create(2, 0))
+        with CaptureQueriesContext(connection) as large:
+            bulk.users_created(create(20, 10))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(UserSkill.objects.filter(skill__name='shared').count(), 22)
+        self.assertEqual(self.client.get(reverse('api-users'), {'lang': 'tamil'}).data['count'], 22)
+
+    def test_filters_match_whole_tags_in_any_case(self):
+        self.assertEqual(self.result_ids(skills='PYTHON'), {self.py.id})
+        self.assertEqual(self.result_ids(skills='python,javascript'), {self.py.id, self.js.id})
+        self.assertEqual(self.result_ids(skills='java'), set())  # no match inside a tag
+        self.assertEqual(self.result_ids(lang='English'), {self.py.id, self.js.id})
+        self.assertEqual(self.result_ids(lang='Eng'), set())
+        self.assertEqual(self.result_ids(skills='go', lang='hindi'), set())
+
+
+class SearchTests(APITestCase):
+
+    def setUp(self):
+        self.by_name = User.objects.create(username='ada', email='ada@example.com', full_name='Pythonista Ada')
+        self.by_skill = User.objects.create(username='bo', email='bo@example.com', full_name='Bo', skills=['Python'])
+        self.by_bio = User.objects.create(username='cy', email='cy@example.com', full_name='Cy',
+                                          bio='Weekend python tinkerer, mostly sewing though')
+
+    def search(self, **params):
+        response = self.client.get(reverse('api-users'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ranked_prefix_matches_over_name_skills_and_bio(self):
+        ids = [row['id'] for row in self.search(search='pyth')['results']]
+        self.assertEqual(ids, [self.by_name.id, self.by_skill.id, self.by_bio.id])
+        self.assertEqual([row['id'] for row in self.search(search='sewing')['results']], [self.by_bio.id])
+        self.assertEqual(self.search(search='"; DROP')['count'], 0)  # quoted, not FTS syntax
+
+    def test_filters_apply_before_ranking_with_no_cap(self):
+        from . import bulk
+        users = User.objects.bulk_create([
+            User(username=f'fan{i}', email=f'fan{i}@example.com', full_name=f'Fan {i}', bio='I love chess',
+                 languages=['Tamil'] if i % 2 else ['English'], age=20 + i % 10)
+            for i in range(600)
+        ])
+        bulk.users_created(users)
+        self.assertEqual(self.search(search='love')['count'], 600)
+        self.assertEqual(self.search(search='love', lang='Tamil')['count'], 300)
+        data = self.search(search='love chess', lang='tamil', age='20-24', limit=5)
+        self.assertEqual(data['count'], 120)  # odd i, ages 21 and 23
+        page = User.objects.in_bulk([row['id'] for row in data['results']])
+        self.assertTrue(all(u.languages == ['Tamil'] and u.age <= 24 for u in page.values()))
+
+
+class SeededFeedTests(APITestCase):
+
+    def setUp(self):
+        # keys 0, 100, ..., 2900; seed 1550 starts mid-way and has to wrap
+        self.users = User.objects.bulk_create([
+            User(username=f'f{i}', email=f'f{i}@example.com', feed_key=i * 100) for i in range(30)
+        ])
+
+    def walk(self, between_pages=None):
+        seen = []
+        url, params = reverse('api-users'), {'seed': 1550, 'page_size': 7}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.data['results']]
+            url, params = response.data['next'], None
+            if between_pages:
+                between_pages()
+        return seen
+
+    def test_walk_wraps_once_without_duplicates(self):
+        seen = self.walk()
+        by_key = sorted(self.users, key=lambda u: u.feed_key)
+        expected = [u.id for u in by_key if u.feed_key >= 1550] + [u.id for u in by_key if u.feed_key < 1550]
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.walk(), seen)  # same seed, same order
+
+    def test_pages_are_stable_under_inserts(self):
+        new = iter(range(100))
+
+        def sign_up():
+            i = next(new)
+            User.objects.create(username=f'new{i}', email=f'new{i}@example.com', feed_key=1550 + i)
+
+        seen = self.walk(between_pages=sign_up)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertLessEqual({u.id for u in self.users}, set(seen))
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('garbage', 'Mi4xLjE=', '!!'):  # "2.1.1": unknown phase
+            with self.subTest(cursor):
+                response = self.client.get(reverse('api-users'), {'seed': 1550, 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class SearchTriggerTests(APITestCase):
+
+    def check_ids(self):
+        from django.core import checks
+        return [e.id for e in checks.run_checks(databases=['default'])]
+
+    def test_migrated_database_has_search_triggers(self):
+        self.assertNotIn('users.E001', self.check_ids())
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER users_user_fts_au')  # rolled back with the test
+        self.assertIn('users.E001', self.check_ids())
+
+
+class SeededListsTestCase(APITestCase):
+    """`me` with N_USERS friends, half of them with a request to me, the
+    rest with one from me, and a notification from each."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com', full_name=f'User {i}',
+                 skills=['Python', 'Guitar'] if i % 2 else ['Design'], languages=['English'], age=20 + i % 30)
+            for i in range(N_USERS + 1)
+        ])
+        users = list(User.objects.order_by('id'))
+        cls.me, cls.others = users[0], users[1:]
+        half = N_USERS // 2
+
+        FriendRequest.objects.bulk_create(
+            [FriendRequest(from_user=u, to_user=cls.me) for u in cls.others[:half]]
+            + [FriendRequest(from_user=cls.me, to_user=u) for u in cls.others[half:]]
+        )
+        # canonical ordering: me has the smallest id
+        Friendship.objects.bulk_create([Friendship(user1=cls.me, user2=u) for u in cls.others])
+        Notification.objects.bulk_create([
+            Notification(user=cls.me, actor_user=u, type=Notification.NOTIF_FRIEND_REQUEST, text='hi')
+            for u in cls.others
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.me)
+
+    def assertBudget(self, url_name, queries, expected_rows):
+        # cold profile cache: ETag stamp + page rows + one in_bulk for the
+        # embeds; warm: stamp + page rows
+        for n in (queries + 1, queries):
+            with self.assertNumQueries(n):
+                response = self.client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data), expected_rows)
+        return response
+
+
+class QueryBudgetTests(SeededListsTestCase):
+
+    def test_received_requests(self):
+        response = self.assertBudget('friends-received', 2, N_USERS // 2)
+        self.assertEqual(response.data[0]['to_user']['id'], self.me.id)
+
+    def test_sent_requests(self):
+        self.assertBudget('friends-sent', 2, N_USERS - N_USERS // 2)
+
+    def test_friends_list(self):
+        response = self.assertBudget('friends-list', 2, N_USERS)
+        friend_ids = {row['friend']['id'] for row in response.data}
+        self.assertNotIn(self.me.id, friend_ids)
+
+    def test_notifications_list(self):
+        response = self.assertBudget('notifications-list', 2, 50)
+        self.assertIsNotNone(response.data[0]['actor'])
+
+
+class NotificationPushTests(APITestCase):
+
+    def test_created_notification_is_published_to_subscriber(self):
+        me = User.objects.create(username='me', email='me@example.com', full_name='Me')
+        actor = User.objects.create(username='actor', email='actor@example.com', full_name='Actor')
+        broker = InMemoryBroker()
+
+        async def subscribe():
+            return broker.subscribe(me.id)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        sub = loop.run_until_complete(subscribe())
+
+        with mock.patch('users.notifications.get_broker', return_value=broker), \
+                self.captureOnCommitCallbacks(execute=True):
+            notif = Notification.objects.create(user=me, actor_user=actor, type=Notification.NOTIF_SYSTEM, text='hello')
+
+        event_id, data = loop.run_until_complete(sub.get(1))
+        self.assertEqual(event_id, notif.id)
+        self.assertEqual(json.loads(data)['actor']['id'], actor.id)
+        broker.unsubscribe(sub)
+        self.assertEqual(broker.subscriber_count(me.id), 0)
+
+    def test_polling_broker_starts_from_the_subscribe_mark(self):
+        me = User.objects.create(username='me', email='me@example.com', full_name='Me')
+        broker = DatabasePollingBroker()
+        mark = Notification.objects.create(user=me, type=Notification.NOTIF_SYSTEM, text='seen').id
+
+        async def subscribe():
+            return broker.subscribe(me.id, after_id=mark)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with mock.patch.object(DatabasePollingBroker, '_run'):  # poll by hand below
+            sub = loop.run_until_complete(subscribe())
+        # committed before the poller's first look
+        notif = Notification.objects.create(user=me, type=Notification.NOTIF_SYSTEM, text='in the gap')
+        self.assertEqual(broker.poll(), 1)
+        self.assertEqual(loop.run_until_complete(sub.get(1))[0], notif.id)
+
+
+class NotificationsTestCase(APITestCase):
+
+    def setUp(self):
+        self.me = User.objects.create(username='me', email='me@example.com', full_name='Me')
+        self.client.force_authenticate(self.me)
+        self.notifs = [
+            Notification.objects.create(user=self.me, type=Notification.NOTIF_SYSTEM, text=f'n{i}')
+            for i in range(3)
+        ]
+
+    def unread(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('notifications-unread-count'))
+        return response.data['unread']
+
+
+class UnreadCounterTests(NotificationsTestCase):
+
+    def test_counter_follows_create_and_mark_read(self):
+        self.assertEqual(self.unread(), 3)
+        url = reverse('notifications-mark-read', args=[self.notifs[0].id])
+        self.client.post(url)
+        self.client.post(url)  # already read: no double decrement
+        self.assertEqual(self.unread(), 2)
+        self.assertEqual(self.client.get(reverse('api-me')).data['unread_notifications'], 2)
+
+    def test_deleting_unread_notifications_decrements(self):
+        first, second, third = self.notifs
+        self.client.post(reverse('notifications-mark-read', args=[first.id]))
+        first.refresh_from_db()
+        first.delete()  # already read: no change
+        self.assertEqual(self.unread(), 2)
+        Notification.objects.filter(id__in=[second.id, third.id]).delete()
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(NotificationCounter.objects.get(user=self.me).unread, 0)
+
+    def test_recount_repairs_drift(self):
+        from .notifications import recount_unread
+        NotificationCounter.objects.filter(user=self.me).update(unread=42)
+        recount_unread()
+        self.assertEqual(self.unread(), 3)
+
+
+class BulkMarkReadTests(NotificationsTestCase):
+
+    def test_bulk_mark_read(self):
+        first, second, third = self.notifs
+        response = self.client.post(reverse('notifications-mark-many-read'),
+                                    {'ids': [first.id, first.id, 999999]}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        response = self.client.post(reverse('notifications-mark-many-read'), {'up_to_id': second.id}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(self.unread(), 1)
+        response = self.client.post(reverse('notifications-mark-all-read'))
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(self.client.post(reverse('notifications-mark-many-read'), {}, format='json').status_code, 400)
+
+
+class FriendGraphTests(APITestCase):
+
+    def setUp(self):
+        User.objects.bulk_create([
+            User(username=f'g{i}', email=f'g{i}@example.com', full_name=f'G {i}') for i in range(6)
+        ])
+        self.u = list(User.objects.order_by('id'))
+        a, b, c, d, e, _ = self.u
+        # a-b, a-c; b-d, c-d, c-e  => d has 2 mutuals with a, e has 1
+        Friendship.objects.bulk_create([
+            Friendship(user1=x, user2=y) for x, y in [(a, b), (a, c), (b, d), (c, d), (c, e)]
+        ])
+        self.graph = FriendGraph()
+        patcher = mock.patch('users.views.friend_graph', return_value=self.graph)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_authenticate(a)
+
+    def test_suggestions_ranked_by_mutual_friends(self):
+        a, b, c, d, e, f = self.u
+        with self.assertNumQueries(2):  # graph load + hydrate the page
+            response = self.client.get(reverse('friends-suggestions'))
+        self.assertEqual([(r['id'], r['mutual_count']) for r in response.data], [(d.id, 2), (e.id, 1)])
+
+        response = self.client.get(reverse('friends-mutual'), {'ids': f'{d.id},{e.id},{f.id}'})
+        self.assertEqual(response.data, {str(d.id): 2, str(e.id): 1, str(f.id): 0})
+
+    def test_graph_follows_new_and_deleted_friendships(self):
+        a, b, c, d, e, f = self.u
+        self.graph.load()
+        with mock.patch('users.signals.friend_graph', return_value=self.graph), \
+                self.captureOnCommitCallbacks(execute=True):
+            Friendship.objects.create(user1=b, user2=f)
+            Friendship.objects.filter(user1=c, user2=e).delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.graph.mutual_counts(a.id, [f.id, e.id]), {f.id: 1, e.id: 0})
+
+
+class RecommendationTests(APITestCase):
+
+    def setUp(self):
+        rows = [('me', ['Python'], ['English']), ('a', ['Guitar', 'Python'], ['English']),
+                ('b', ['Guitar'], ['Hindi']), ('c', ['Cooking', 'Guitar'], ['English']),
+                ('d', ['Python'], ['English']), ('e', ['Guitar'], ['English'])]
+        User.objects.bulk_create([
+            User(username=n, email=f'{n}@example.com', skills=skills, languages=langs) for n, skills, langs in rows
+        ])
+        self.u = {u.username: u for u in User.objects.all()}
+        # idf over the 6 users: 4 list guitar, 1 cooking
+        self.guitar, self.cooking = math.log(7 / 5) + 1, math.log(7 / 2) + 1
+
+    def recommend(self, matrix, who='me', **kwargs):
+        me = self.u[who]
+        return [(self.u_name(uid), round(score, 6))
+                for uid, score in matrix.recommend(me.id, me.skills, me.languages, **kwargs)]
+
+    def u_name(self, uid):
+        return next(n for n, u in self.u.items() if u.id == uid)
+
+    def test_complementary_skills_scored_by_idf_with_language_penalty(self):
+        g, c = self.guitar, self.cooking
+        # ties go to the newer user; d only knows what I know
+        expected = [('c', round(g + c, 6)), ('e', round(g, 6)), ('a', round(g, 6)), ('b', round(g / 2, 6))]
+        self.assertEqual(self.recommend(SkillMatrix()), expected)
+        self.assertEqual(self.recommend(SkillMatrix(), exclude={self.u['e'].id}, k=2), [expected[0], expected[2]])
+        self.assertEqual(self.recommend(SkillMatrix(), want=['COOKING', 'unknown']), [('c', round(c, 6))])
+
+    def recommend_after_updates(self):
+        matrix = SkillMatrix()
+        matrix.load()
+        matrix.update_user(self.u['d'].id, ['Cooking'], ['English'])
+        matrix.remove_user(self.u['c'].id)
+        return self.recommend(matrix)
+
+    def test_pure_python_fallback_and_live_updates_agree(self):
+        with mock.patch('users.recommend.np', None):
+            fallback = self.recommend_after_updates()
+        self.assertEqual(self.recommend_after_updates(), fallback)
+        self.assertEqual([name for name, _ in fallback], ['d', 'e', 'a', 'b'])
+
+    def test_reload_picks_up_other_processes_writes(self):
+        matrix = SkillMatrix(ttl=60)
+        self.assertNotIn('f', dict(self.recommend(matrix)))
+        # bulk_create skips the signal handlers, like a write from another process
+        self.u['f'] = User.objects.bulk_create([User(username='f', email='f@example.com', skills=['Chess'])])[0]
+        self.assertNotIn('f', dict(self.recommend(matrix)))
+        with mock.patch('users.recommend.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIn('f', dict(self.recommend(matrix)))
+
+    def test_endpoint_leaves_out_friends(self):
+        Friendship.objects.create(user1=self.u['me'], user2=self.u['c'])
+        self.client.force_authenticate(self.u['me'])
+        with mock.patch('users.views.skill_matrix', return_value=SkillMatrix()), \
+                mock.patch('users.views.friend_graph', return_value=FriendGraph()):
+            response = self.client.get(reverse('api-users-recommended'), {'k': 2})
+        self.assertEqual([(r['username'], r['score']) for r in response.data],
+                         [('e', round(self.guitar, 4)), ('a', round(self.guitar, 4))])
+
+
+class ChatTests(APITestCase):
+
+    def setUp(self):
+        self.me, self.friend, self.stranger = User.objects.bulk_create([
+            User(username=n, email=f'{n}@example.com', full_name=n.title()) for n in ('me', 'friend', 'stranger')
+        ])
+        Friendship.objects.create(user1=self.me, user2=self.friend)
+        key = Message.conversation_key(self.me.id, self.friend.id)
+        self.messages = Message.objects.bulk_create([
+            Message(conversation=key, sender=s, recipient=r, text=f'm{i}')
+            for i, (s, r) in enumerate([(self.me, self.friend), (self.friend, self.me)] * 5)
+        ])
+        self.client.force_authenticate(self.me)
+
+    def history(self, other, **params):
+        return self.client.get(reverse('chat-history', args=[other.id]), params)
+
+    def send(self, other, message):
+        return self.client.post(reverse('chat-send', args=[other.id]), {'message': message}, format='json')
+
+    def test_history_pages_backwards_oldest_first(self):
+        response = self.history(self.friend, limit=4)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m['text'] for m in response.data], ['m6', 'm7', 'm8', 'm9'])
+        self.assertEqual(response.data[0]['from_name'], 'Me')
+        self.assertEqual(response.data[1]['from_name'], 'Friend')
+
+        older = self.history(self.friend, limit=4, before=response.data[0]['id'])
+        self.assertEqual([m['text'] for m in older.data], ['m2', 'm3', 'm4', 'm5'])
+        oldest = self.history(self.friend, limit=4, before=older.data[0]['id'])
+        self.assertEqual([m['text'] for m in oldest.data], ['m0', 'm1'])
+        self.assertEqual(self.history(self.friend, before=oldest.data[0]['id']).data, [])
+        self.assertEqual(len(self.history(self.friend).data), 10)
+
+    def test_history_rejects_bad_cursor(self):
+        self.assertEqual(self.history(self.friend, before='x').status_code, 400)
+        self.assertEqual(self.history(self.friend, limit='x').status_code, 400)
+
+    def test_only_friends_can_chat(self):
+        self.assertEqual(self.history(self.stranger).status_code, 403)
+        self.assertEqual(self.send(self.stranger, 'hi').status_code, 403)
+        self.assertFalse(Message.objects.filter(recipient=self.stranger).exists())
+        self.client.force_authenticate(self.friend)
+        self.assertEqual(self.history(self.me).status_code, 200)
+
+    def test_send_stores_message_and_queues_notification(self):
+        response = self.send(self.friend, '  hello  ')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['text'], response.data['from_name']), ('hello', 'Me'))
+        self.assertEqual(self.history(self.friend).data[-1]['id'], response.data['id'])
+
+        self.assertFalse(Notification.objects.filter(user=self.friend).exists())
+        self.assertEqual(outbox.run_pending(), 1)
+        notif = Notification.objects.get(user=self.friend)
+        self.assertEqual(notif.type, Notification.NOTIF_MESSAGE)
+        self.assertEqual(notif.data, {'message_id': response.data['id'], 'from': self.me.id})
+
+    def test_send_validation(self):
+        self.assertEqual(self.send(self.friend, '   ').status_code, 400)
+        self.assertEqual(self.send(self.friend, 'x' * 2001).status_code, 400)
+        self.assertEqual(self.send(self.me, 'hi').status_code, 400)
+        self.assertEqual(self.client.post(reverse('chat-send', args=[0]), {'message': 'hi'}).status_code, 404)
+        self.assertEqual(Message.objects.count(), len(self.messages))
+
+
+class CachedAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        from .authentication import user_cache
+        from .token_views import MyTokenObtainPairSerializer
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(username='auth', email='auth@example.com', password='secret123', full_name='Auth')
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def me(self, queries):
+        with self.assertNumQueries(queries):
+            return self.client.get(reverse('api-me'))
+
+    def test_cache_hit_skips_user_query(self):
+        self.assertEqual(self.me(2).status_code, 200)   # user row + unread counter
+        self.assertEqual(self.me(1).status_code, 200)   # counter only
+
+    def test_save_invalidates_and_password_change_revokes(self):
+        self.me(2)
+        self.user.full_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.me(2).data['full_name'], 'Renamed')
+
+        self.user.set_password('changed456')
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('api-me')).status_code, 401)
+
+
+class ProfileCacheTests(SeededListsTestCase):
+
+    def test_profile_change_reaches_embeds(self):
+        self.assertBudget('friends-list', 2, N_USERS)
+        friend = self.others[0]
+        friend.full_name = 'Renamed'
+        friend.save()
+        response = self.client.get(reverse('friends-list'))
+        names = {row['friend']['id']: row['friend']['full_name'] for row in response.data}
+        self.assertEqual(names[friend.id], 'Renamed')
+
+
+class FeedResultCacheTests(APITestCase):
+
+    def setUp(self):
+        feed_results.clear()
+        self.python = User.objects.create(username='py', email='py@example.com', full_name='Py',
+                                          skills=['Python'], languages=['English'], age=22)
+        self.design = User.objects.create(username='de', email='de@example.com', full_name='De',
+                                          skills=['Design'], languages=['English'], age=30)
+        self.url = reverse('api-users') + '?skills=python&lang=English&age=18-25'
+
+    def result_ids(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_repeated_filter_only_hydrates_the_page(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.result_ids(), [self.python.id])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.result_ids(), [self.python.id])
+
+    def test_profile_change_moves_user_in_and_out(self):
+        self.result_ids()
+        self.design.skills = ['Python']
+        self.design.age = 24
+        self.design.save()
+        self.assertEqual(self.result_ids(), [self.design.id, self.python.id])
+
+        self.python.age = 40
+        self.python.save(update_fields=['age'])
+        self.assertEqual(self.result_ids(), [self.design.id])
+
+    def test_unrelated_change_keeps_entry(self):
+        self.result_ids()
+        self.design.full_name = 'Designer'
+        self.design.save()
+        with self.assertNumQueries(1):
+            self.result_ids()
+
+
+class PerformanceMetricsTests(APITestCase):
+
+    def setUp(self):
+        metrics_registry.clear()
+        self.staff = User.objects.create(username='ops', email='ops@example.com', is_staff=True)
+
+    def test_server_timing_and_metrics_endpoint(self):
+        response = self.client.get(reverse('api-users'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+        self.client.force_authenticate(self.staff)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('xchange_request_seconds{route="api-users",quantile="0.99"}', body)
+        self.assertIn('xchange_db_queries_count{route="api-users"} 1', body)
+
+    def test_metrics_are_staff_only(self):
+        user = User.objects.create(username='u', email='u@example.com')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+
+class ProfilingCaptureTests(APITestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = self.settings(PROFILE_CAPTURE_DIR=Path(self.tmp.name), PROFILE_CAPTURE_KEEP=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.staff = User.objects.create(username='ops', email='ops@example.com', is_staff=True)
+
+    def test_flag_is_ignored_for_non_staff(self):
+        response = self.client.get(reverse('api-users') + '?_profile=1')
+        self.assertNotIn('X-Profile-Capture', response)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    def test_staff_capture_is_listed_rotated_and_downloadable(self):
+        self.client.force_login(self.staff)
+        names = [self.client.get(reverse('api-users'), HTTP_X_PROFILE='1')['X-Profile-Capture']
+                 for _ in range(3)]
+        self.assertEqual(len(list(Path(self.tmp.name).iterdir())), 2)
+
+        page = self.client.get(reverse('admin-profiles'))
+        self.assertContains(page, names[-1])
+        summary = self.client.get(reverse('admin-profile-download', args=[names[-1]]) + '?format=txt')
+        self.assertContains(summary, 'function calls')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SeedAndBenchmarkTests(APITestCase):
+
+    def test_seed_then_benchmark_every_route(self):
+        call_command('seed_social_graph', users=40, friends=2, random_seed=7, stdout=io.StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='seed').count(), 40)
+        self.assertGreaterEqual(Friendship.objects.count(), 2 * (40 - 3))
+        me = User.objects.get(username='seed5')
+        self.assertEqual(get_unread(me.id), Notification.objects.filter(user=me, is_read=False).count())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / 'bench.json'
+            call_command('bench_routes', requests=2, warmup=0, writes=True, output=str(out), stdout=io.StringIO())
+            report = json.loads(out.read_text())
+        self.assertEqual(report['not_covered'], [])
+        self.assertLessEqual({'notifications-mark-read', 'notifications-mark-many-read', 'notifications-mark-all-read'},
+                             {case['route'] for case in report['cases']})
+        for case in report['cases']:
+            self.assertEqual(case['errors'], 0, case)
+            self.assertIn('p95_ms', case)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+                   BULK_SIGNUP_HASH_WORKERS=0)
+class BatchSignupTests(APITestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create(username='ops', email='ops@example.com', is_staff=True)
+        self.client.force_authenticate(self.staff)
+
+    def payload(self, i, **extra):
+        return {'full_name': f'New {i}', 'email': f'new{i}@Example.com', 'password': 'secret123',
+                'bio': ' '.join(['word'] * 120), 'age': 25, 'skills': ['Python'], 'languages': ['English'],
+                **extra}
+
+    def test_batch_reuses_signup_rules_with_fixed_queries(self):
+        User.objects.create(username='taken', email='new0@example.com')
+        User.objects.create(username='new1', email='someone@example.com')
+        rows = [self.payload(i) for i in range(6)] + [self.payload(6, bio='too short'), self.payload(2)]
+
+        response = self.client.post(reverse('api-signup-batch'), rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([r['line'] for r in response.data['created']], [2, 3, 4, 5, 6])
+        self.assertEqual({r['line']: list(r['errors']) for r in response.data['errors']},
+                         {1: ['email'], 7: ['bio'], 8: ['email']})
+        user = User.objects.get(email='new1@example.com')
+        self.assertNotEqual(user.username, 'new1')  # taken local part gets a suffix
+        self.assertTrue(user.check_password('secret123'))
+
+        more = [self.payload(i) for i in range(10, 40)]
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(reverse('api-signup-batch'), more[:3], format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(reverse('api-signup-batch'), more[3:], format='json')
+        self.assertEqual(len(small), len(large))
+
+    @override_settings(BULK_SIGNUP_HASH_WORKERS=1)
+    def test_hashes_in_a_worker_process(self):
+        self.addCleanup(self.close_shared_pool)
+        response = self.client.post(reverse('api-signup-batch'), [self.payload(i) for i in range(2)], format='json')
+        self.assertEqual(len(response.data['created']), 2)
+        for user in User.objects.filter(email__in=['new0@example.com', 'new1@example.com']):
+            # the spawned worker loads config.settings itself, so it hashes
+            # with the default hasher rather than the MD5 one above
+            self.assertTrue(PBKDF2PasswordHasher().verify('secret123', user.password))
+
+        # a single password is hashed in-process
+        with mock.patch.object(password_pool._shared_pool, 'map') as pool_map:
+            self.client.post(reverse('api-signup-batch'), [self.payload(2)], format='json')
+        pool_map.assert_not_called()
+        self.assertTrue(User.objects.get(email='new2@example.com').password.startswith('md5$'))
+
+    def close_shared_pool(self):
+        if password_pool._shared_pool is not None:
+            password_pool._shared_pool.shutdown()
+            password_pool._shared_pool = None
+
+    def test_ndjson_body_and_staff_only(self):
+        body = '\n'.join(json.dumps(self.payload(i)) for i in range(3)) + '\n{broken\n'
+        response = self.client.post(reverse('api-signup-batch'), body, content_type='application/x-ndjson')
+        self.assertEqual(len(response.data['created']), 3)
+        self.assertEqual(response.data['errors'][0]['line'], 4)
+
+        self.client.force_authenticate(User.objects.get(email='new0@example.com'))
+        response = self.client.post(reverse('api-signup-batch'), [self.payload(9)], format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ExportTests(APITestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create(username='ops', email='ops@example.com', is_staff=True)
+        self.users = [User.objects.create(username=f'u{i}', email=f'u{i}@example.com', skills=['Go'])
+                      for i in range(3)]
+        Friendship.objects.create(user1=self.users[0], user2=self.users[1])
+        self.client.force_authenticate(self.staff)
+
+    def get(self, kind, query=''):
+        response = self.client.get(reverse('export', args=[kind]) + query)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_incremental_pull(self):
+        rows = [json.loads(line) for line in self.get('users', f'?after_id={self.users[0].id}').splitlines()]
+        self.assertEqual([r['id'] for r in rows], [u.id for u in self.users[1:]])
+        self.assertEqual(rows[0]['skills'], ['Go'])
+        self.assertNotIn('password', rows[0])
+
+    def test_updated_since_picks_up_edits(self):
+        notif = Notification.objects.create(user=self.users[1], type=Notification.NOTIF_SYSTEM, text='hi')
+        since = timezone.now() + timedelta(seconds=1)
+        query = '?' + urlencode({'updated_since': since.isoformat()})
+        self.assertEqual(self.get('users', query), '')
+        self.assertEqual(self.get('notifications', query), '')
+
+        with mock.patch('django.utils.timezone.now', return_value=since + timedelta(seconds=1)):
+            self.users[0].bio = 'edited'
+            self.users[0].save()
+            self.client.force_authenticate(self.users[1])
+            self.client.post(reverse('notifications-mark-all-read'))
+        self.client.force_authenticate(self.staff)
+        users = [json.loads(line) for line in self.get('users', query).splitlines()]
+        self.assertEqual([(r['id'], r['bio']) for r in users], [(self.users[0].id, 'edited')])
+        notifs = [json.loads(line) for line in self.get('notifications', query).splitlines()]
+        self.assertEqual([(r['id'], r['is_read']) for r in notifs], [(notif.id, True)])
+
+    def test_csv_and_permissions(self):
+        lines = self.get('friendships', '?format=csv').splitlines()
+        self.assertEqual(lines[0], 'id,user1_id,user2_id,created_at')
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(self.client.get(reverse('export', args=['nope'])).status_code, 404)
+
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.client.get(reverse('export', args=['users'])).status_code, 403)
+
+
+class ReadRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def test_list_views_read_through_the_read_alias(self):
+        me = User.objects.create(username='me', email='me@example.com')
+        self.client.force_login(me)
+        with CaptureQueriesContext(connections['default']) as writes, \
+                CaptureQueriesContext(connections['replica']) as reads:
+            response = self.client.get(reverse('api-users') + '?age=1-120')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(reads), 0)
+        self.assertEqual([q['sql'] for q in writes if q['sql'].startswith('SELECT')], [])
+
+    def test_reads_inside_a_transaction_stay_on_default(self):
+        with transaction.atomic(), read_only_db():
+            User.objects.create(username='new', email='new@example.com')
+            self.assertTrue(User.objects.filter(username='new').exists())
+
+
+class FriendRequestTransitionTests(APITestCase):
+
+    def setUp(self):
+        self.alice, self.bob, self.carol = User.objects.bulk_create([
+            User(username=n, email=f'{n}@example.com', full_name=n.title()) for n in ('alice', 'bob', 'carol')
+        ])
+        self.fr = FriendRequest.objects.create(from_user=self.alice, to_user=self.bob)
+        NotificationCounter.objects.bulk_create([NotificationCounter(user=u) for u in (self.alice, self.bob)])
+        self.client.force_authenticate(self.bob)
+
+    def test_accept_runs_fixed_queries_and_only_once(self):
+        url = reverse('friends-accept', args=[self.fr.id])
+        # savepoint, UPDATE, from_user lookup, friendship, outbox job, release
+        with self.assertNumQueries(6):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.fr.refresh_from_db()
+        self.assertEqual(self.fr.status, FriendRequest.STATUS_ACCEPTED)
+        self.assertEqual(Friendship.objects.count(), 1)
+        self.assertEqual(outbox.run_pending(), 1)
+        self.assertEqual(Notification.objects.filter(type=Notification.NOTIF_FRIEND_ACCEPT).count(), 2)
+        self.assertEqual(get_unread(self.alice.id), 1)
+
+        # the loser of a race sees the row already moved on
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Friendship.objects.count(), 1)
+
+    def test_refusals(self):
+        self.client.force_authenticate(self.carol)
+        self.assertEqual(self.client.post(reverse('friends-accept', args=[self.fr.id])).status_code, 403)
+        self.assertEqual(self.client.delete(reverse('friends-cancel', args=[self.fr.id])).status_code, 403)
+        self.assertEqual(self.client.post(reverse('friends-reject', args=[self.fr.id + 100])).status_code, 404)
+
+        self.client.force_authenticate(self.alice)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.delete(reverse('friends-cancel', args=[self.fr.id])).status_code, 200)
+        response = self.client.delete(reverse('friends-cancel', args=[self.fr.id]))
+        self.assertEqual((response.status_code, response.data['detail']), (400, 'cannot cancel'))
+
+
+class FeedRelationshipTests(APITestCase):
+
+    def setUp(self):
+        self.alice, self.bob, self.carol = User.objects.bulk_create([
+            User(username=n, email=f'{n}@example.com', full_name=n.title()) for n in ('alice', 'bob', 'carol')
+        ])
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.bob)
+        Friendship.objects.create(user1=self.bob, user2=self.carol)
+        self.client.force_authenticate(self.bob)
+
+    def test_feed_items_carry_relationship(self):
+        with self.assertNumQueries(4):  # feed page (both shuffle phases) + friendships + pending requests
+            response = self.client.get(reverse('api-users'))
+        seen = {r['id']: r['relationship'] for r in response.data['results']}
+        self.assertEqual(seen, {self.alice.id: 'incoming_pending', self.bob.id: 'none', self.carol.id: 'friends'})
+
+        self.client.force_authenticate(self.alice)
+        response = self.client.get(reverse('api-users'))
+        self.assertEqual({r['id']: r['relationship'] for r in response.data['results']}[self.bob.id], 'outgoing_pending')
+
+    def test_exclude_friends(self):
+        with mock.patch('users.views.friend_graph', return_value=FriendGraph()):
+            response = self.client.get(reverse('api-users'), {'exclude_friends': '1'})
+        self.assertNotIn(self.carol.id, [r['id'] for r in response.data['results']])
+
+
+class BootstrapTests(SeededListsTestCase):
+
+    def test_bootstrap_shares_one_prefetch(self):
+        # friendships, received, sent, notifications, feed page, unread count;
+        # plus one profile in_bulk when the cache is cold
+        for n in (7, 6):
+            with self.assertNumQueries(n):
+                response = self.client.get(reverse('api-bootstrap'), {'seed': 0})
+        data = response.data
+        self.assertEqual(data['me']['id'], self.me.id)
+        self.assertEqual((len(data['friends']), data['friends_count']), (N_USERS, N_USERS))
+        self.assertEqual(len(data['requests']['received']) + len(data['requests']['sent']), N_USERS)
+        self.assertEqual(len(data['notifications']), 50)
+        self.assertEqual(len(data['feed']['results']), 20)
+        self.assertIn('/api/users/', data['feed']['next'])
+        self.assertEqual({u['relationship'] for u in data['feed']['results'] if u['id'] != self.me.id}, {'friends'})
+
+    def test_sections_match_the_list_endpoints(self):
+        data = self.client.get(reverse('api-bootstrap'), {'seed': 0}).data
+        friends = self.client.get(reverse('friends-list')).data
+        self.assertEqual(sorted(data['friends'], key=lambda r: r['id']), sorted(friends, key=lambda r: r['id']))
+        self.assertEqual(data['notifications'], self.client.get(reverse('notifications-list')).data)
+        feed = self.client.get(reverse('api-users'), {'seed': 0}).data
+        self.assertEqual(data['feed']['results'], feed['results'])
+
+    def test_lists_are_capped(self):
+        with mock.patch.object(BootstrapView, 'list_limit', 10):
+            # + the friend count, + the feed's own relationship lookup
+            with self.assertNumQueries(10):
+                data = self.client.get(reverse('api-bootstrap'), {'seed': 0}).data
+        self.assertEqual((len(data['friends']), data['friends_count']), (10, N_USERS))
+        self.assertEqual((len(data['requests']['received']), len(data['requests']['sent'])), (10, 10))
+        self.assertEqual({u['relationship'] for u in data['feed']['results'] if u['id'] != self.me.id}, {'friends'})
+
+
+class ConditionalGetTests(SeededListsTestCase):
+
+    def test_unchanged_list_answers_304(self):
+        response = self.client.get(reverse('notifications-list'))
+        etag = response['ETag']
+        with self.assertNumQueries(1):  # the stamp only
+            response = self.client.get(reverse('notifications-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Notification.objects.filter(user=self.me).update(is_read=True)
+        response = self.client.get(reverse('notifications-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        me = self.client.get(reverse('api-me'))
+        self.assertEqual(self.client.get(reverse('api-me'), HTTP_IF_NONE_MATCH=me['ETag']).status_code, 304)
+
+    def test_large_lists_are_compressed(self):
+        response = self.client.get(reverse('friends-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertNotIn('Content-Encoding', self.client.get(reverse('friends-list')))
+
+
+class ReadSerializerTests(SeededListsTestCase):
+
+    def test_read_serializers_match_model_serializers(self):
+        from types import SimpleNamespace
+        from rest_framework.renderers import JSONRenderer
+        from .read_serializers import FeedUserReadSerializer, FriendshipReadSerializer, NotificationReadSerializer
+        from .renderers import FastJSONRenderer
+        from .serializers import FeedUserSerializer, FriendshipSerializer, NotificationSerializer
+
+        Notification.objects.create(user=self.me, type=Notification.NOTIF_SYSTEM, text='line break é',
+                                    data={'request_id': 7, 'tags': ['x', None]})
+        context = {'request': SimpleNamespace(user=self.me)}
+        pairs = [
+            (FeedUserSerializer, FeedUserReadSerializer, User.objects.order_by('id')),
+            (FriendshipSerializer, FriendshipReadSerializer, Friendship.objects.order_by('id')),
+            (NotificationSerializer, NotificationReadSerializer, Notification.objects.order_by('-id')),
+        ]
+        for model_serializer, read_serializer, queryset in pairs:
+            with self.subTest(read_serializer.__name__):
+                expected = model_serializer(queryset, many=True, context=dict(context)).data
+                actual = read_serializer(queryset, many=True, context=dict(context)).data
+                self.assertEqual(JSONRenderer().render(expected), JSONRenderer().render(actual))
+                self.assertEqual(FastJSONRenderer().render(expected), JSONRenderer().render(expected))
+
+
+class OutboxTests(APITestCase):
+
+    def setUp(self):
+        self.a, self.b = User.objects.bulk_create([
+            User(username=n, email=f'{n}@example.com', full_name=n.upper()) for n in ('a', 'b')
+        ])
+
+    def notification(self, text):
+        return dict(user_id=self.a.id, actor_user_id=self.b.id, type=Notification.NOTIF_SYSTEM, text=text, data=None)
+
+    def test_send_only_enqueues_and_worker_batches(self):
+        self.client.force_authenticate(self.b)
+        self.client.post(reverse('friends-send'), {'to_user': self.a.id})
+        outbox.enqueue_notifications(self.notification('one'), self.notification('two'))
+        self.assertFalse(Notification.objects.exists())
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(outbox.run_batch(worker='w1'), 2)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "users_notification"')]
+        self.assertEqual(len(inserts), 1)  # both jobs, one bulk_create
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(get_unread(self.a.id), 3)
+        self.assertFalse(OutboxJob.objects.exists())
+
+    def test_claim_is_exclusive_and_failures_back_off(self):
+        good = outbox.enqueue_notifications(self.notification('ok'))
+        bad = outbox.enqueue('notifications', {'notifications': [{'no_such_field': 1}]})
+        self.assertEqual(len(outbox.claim(10, 'w1', lease=300)), 2)
+        self.assertEqual(outbox.claim(10, 'w2', lease=300), [])
+
+        OutboxJob.objects.update(status=OutboxJob.STATUS_PENDING, locked_by='')
+        with self.assertLogs('users.outbox', 'ERROR'):
+            outbox.run_batch(worker='w1')
+        self.assertFalse(OutboxJob.objects.filter(id=good.id).exists())  # rest of the batch still ran
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), (OutboxJob.STATUS_PENDING, 1))
+        self.assertGreater(bad.run_after, good.run_after)
+        self.assertIn('no_such_field', bad.last_error)
+        self.assertEqual(outbox.run_batch(worker='w1'), 0)  # not due yet
+
+        with self.settings(OUTBOX_MAX_ATTEMPTS=2):
+            OutboxJob.objects.update(run_after=bad.created_at)
+            with self.assertLogs('users.outbox', 'ERROR'):
+                outbox.run_batch(worker='w1')
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), (OutboxJob.STATUS_FAILED, 2))
+
+    def test_polling_broker_delivers_rows_from_other_processes(self):
+        broker = DatabasePollingBroker()
+        broker.poll()  # starts from the newest row
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def subscribe():
+            return InMemoryBroker.subscribe(broker, self.a.id)  # without the poller thread
+
+        sub = loop.run_until_complete(subscribe())
+        notif = Notification.objects.create(**self.notification('from the worker'))
+        Notification.objects.create(**{**self.notification('not mine'), 'user_id': self.b.id})
+        self.assertEqual(broker.poll(), 1)
+        event_id, data = loop.run_until_complete(sub.get(1))
+        self.assertEqual((event_id, json.loads(data)['text']), (notif.id, 'from the worker'))
@@ -8,6 +8,8 @@ from rest_framework import status
 
 from django.contrib.auth import get_user_model, authenticate
 
+from .authentication import add_version_claim
+
 User = get_user_model()
 
 # Keep existing token view for username-based auth (optional)
@@ -19,6 +21,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         token['full_name'] = getattr(user, 'full_name', '')
         token['email'] = getattr(user, 'email', '')
+        add_version_claim(token, user)
         return token
 
     def validate(self, attrs):
@@ -72,7 +75,7 @@ class EmailTokenView(APIView):
             return Response({"detail":"User account is disabled."}, status=status.HTTP_403_FORBIDDEN)
 
         # create tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = add_version_claim(RefreshToken.for_user(user), user)
         access = str(refresh.access_token)
         refresh_token = str(refresh)
 
@@ -26,6 +26,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from django.contrib.auth import authenticate
 from rest_framework import serializers
+from .authentication import add_version_claim
 
 User = get_user_model()
 
@@ -39,6 +40,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         # add custom claims if you want:
         token['full_name'] = user.full_name
         token['email'] = user.email
+        add_version_claim(token, user)
         return token
 
     def validate(self, attrs):
@@ -79,104 +81,181 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status, generics
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth import get_user_model
 
+from .authentication import CachedJWTAuthentication
 from .serializers import UserSerializer
+from . import skill_index
+from .search import search_users
+from .pagination import SeededFeedPagination, FilteredResultsPagination
+from .feed_cache import feed_results, filter_key, parse_age
+from .notifications import add_unread, get_unread, reset_unread
+from .recommend import skill_matrix
+from .graph import friend_graph
+from .db_router import ReadOnlyDatabaseMixin
+from .conditional import ConditionalGetMixin, aggregate_stamp
+from .read_serializers import FeedUserReadSerializer, FriendshipReadSerializer, NotificationReadSerializer
 
 User = get_user_model()
 
 # -------------------------
 # GET /api/me/  -> current user
 # -------------------------
-class MeView(APIView):
-    authentication_classes = (JWTAuthentication,)
+class MeView(ConditionalGetMixin, generics.RetrieveAPIView):
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
+    serializer_class = UserSerializer
 
-    def get(self, request, *args, **kwargs):
-        user = request.user
-        serializer = UserSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_object(self):
+        return self.request.user
+
+    def get_version(self, request):
+        # the user comes from the auth cache; the badge count is the only read
+        self.unread = get_unread(request.user.id)
+        fields = tuple(getattr(request.user, f) for f in UserSerializer.Meta.fields)
+        return (fields, self.unread), None
+
+    def retrieve(self, request, *args, **kwargs):
+        data = dict(self.get_serializer(self.get_object()).data)
+        data['unread_notifications'] = self.unread
+        return Response(data, status=status.HTTP_200_OK)
 
 # -------------------------
 # GET /api/users/  -> users list + simple filters
 # query params supported:
-#   ?search=python         (search in skills or full_name)
+#   ?search=python         (full-text: name, username, bio, skills; ranked)
 #   ?age=18-25 or lt18 or 35+
-#   ?skills=Python,ML      (comma-separated)
+#   ?skills=Python,ML      (comma-separated, any of; whole tags, any case)
 #   ?lang=Hindi
+#   ?exclude_friends=1     (signed in: leave out people I'm already friends with)
+#
+# Each item carries `relationship` (none / friends / outgoing_pending /
+# incoming_pending), worked out for the whole page in two queries.
+#
+# Without filters this is the discovery feed: a seeded shuffle served in
+# cursor pages (?seed=&cursor=, see users/pagination.py). Filtered results
+# come in ?limit=&offset= pages over a cached id list (users/feed_cache.py).
 # -------------------------
-class UsersListView(generics.ListAPIView):
+class UsersListView(ReadOnlyDatabaseMixin, generics.ListAPIView):
     permission_classes = (AllowAny,)
-    serializer_class = UserSerializer
-    pagination_class = None  # remove or set a DRF paginator if desired
+    serializer_class = FeedUserReadSerializer  # values_list() rows (users/read_serializers.py)
+    pagination_class = SeededFeedPagination  # unfiltered feed
+    filtered_pagination_class = FilteredResultsPagination
+
+    def get_filters(self):
+        params = self.request.query_params
+        return {
+            'search': params.get('search', '').strip(),
+            'age': params.get('age', '').strip(),
+            'skills': params.get('skills', '').strip(),
+            'lang': params.get('lang', '').strip(),
+        }
+
+    def get_excluded_ids(self):
+        # the cached id lists are shared by everyone, so excluding friends
+        # happens after the cache, from the in-memory friend graph
+        flag = self.request.query_params.get('exclude_friends', '').lower()
+        if flag not in ('1', 'true', 'yes') or not self.request.user.is_authenticated:
+            return frozenset()
+        return friend_graph().friends(self.request.user.id)
+
+    def list(self, request, *args, **kwargs):
+        filters = self.get_filters()
+        excluded = self.get_excluded_ids()
+        if not any(filters.values()):
+            queryset = self.get_queryset()
+            if excluded:
+                queryset = queryset.exclude(id__in=excluded)
+            # named rows: the paginator reads .feed_key / .id for the cursor
+            page = self.paginate_queryset(FeedUserReadSerializer.values(queryset, 'feed_key', named=True))
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        # filtered: page through the (cached) id list, then load just that page
+        ids = self.get_result_ids(filters)
+        if excluded:
+            ids = [uid for uid in ids if uid not in excluded]
+        paginator = self.filtered_pagination_class()
+        page_ids = paginator.paginate_queryset(ids, request, view=self)
+        rows = {row[0]: row for row in FeedUserReadSerializer.values(User.objects.filter(is_active=True, id__in=page_ids))}
+        page = [rows[uid] for uid in page_ids if uid in rows]
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def get_result_ids(self, filters):
+        key = filter_key(filters)
+        if key is None:
+            return list(self.get_queryset().values_list('id', flat=True))
+        ids = feed_results.get(key)
+        if ids is None:
+            generation = feed_results.generation
+            ids = list(self.get_queryset().values_list('id', flat=True))
+            feed_results.put(key, ids, generation)
+        return ids
 
     def get_queryset(self):
         qs = User.objects.filter(is_active=True).order_by('-id')  # newest first
 
-        # get raw query params
-        search = self.request.query_params.get('search', '').strip()
-        age = self.request.query_params.get('age', '').strip()
-        skills_q = self.request.query_params.get('skills', '').strip()
-        lang = self.request.query_params.get('lang', '').strip()
-
-        # filter by age range
-        if age:
-            if age == 'lt18':
-                qs = qs.filter(age__lt=18)
-            elif age == '35+':
-                qs = qs.filter(age__gte=35)
-            elif '-' in age:
-                parts = age.split('-', 1)
-                try:
-                    a1 = int(parts[0]); a2 = int(parts[1])
-                    qs = qs.filter(age__gte=a1, age__lte=a2)
-                except ValueError:
-                    pass
-
-        # For skills/lang/search — SQLite may not support JSON lookups consistently,
-        # so we filter in Python for safety (works fine for small prototype / 10 users).
-        users = list(qs)
-
-        def matches(u):
-            # search in full_name or skills
-            if search:
-                s = search.lower()
-                name_ok = (u.full_name or u.username or '').lower().find(s) != -1
-                skills_ok = False
-                try:
-                    for sk in (u.skills or []):
-                        if s in str(sk).lower():
-                            skills_ok = True; break
-                except Exception:
-                    skills_ok = False
-                if not (name_ok or skills_ok):
-                    return False
-
-            if skills_q:
-                wanted = [x.strip().lower() for x in skills_q.split(',') if x.strip()]
-                user_skills = [str(x).lower() for x in (u.skills or [])]
-                # require that user has at least one of the wanted skills
-                if not any(w in ' '.join(user_skills) for w in wanted):
-                    return False
-
-            if lang:
-                user_langs = [str(x).lower() for x in (u.languages or [])]
-                if lang.lower() not in user_langs:
-                    return False
-
-            return True
-
-        filtered = [u for u in users if matches(u)]
-
-        # If no filters provided, emulate "random / instagram" feel by shuffling
-        if not (search or age or skills_q or lang):
-            import random
-            random.shuffle(filtered)
-
-        return filtered
+        filters = self.get_filters()
+        search = filters['search']
+        skills_q = filters['skills']
+        lang = filters['lang']
+
+        # filter by age range (bounds are inclusive)
+        age_range = parse_age(filters['age'])
+        if age_range is not None:
+            low, high = age_range
+            if low is not None:
+                qs = qs.filter(age__gte=low)
+            if high is not None:
+                qs = qs.filter(age__lte=high)
+
+        # skills / lang go through the normalized Skill/Language tables
+        # (see users/skill_index.py) so they run as indexed joins.
+        if skills_q:
+            wanted = [x for x in skills_q.split(',') if x.strip()]
+            qs = qs.filter(id__in=skill_index.users_with_any_skill(wanted))
+
+        if lang:
+            qs = qs.filter(id__in=skill_index.users_with_language(lang))
+
+        # full-text search over name / username / bio / skills, best match first
+        if search:
+            qs = search_users(qs, search)
+
+        return qs
     
     
+# -------------------------
+# GET /api/users/recommended/?want=Python,ML&k=20
+# Users who know what I want to learn (default: skills I don't have),
+# scored over the whole user base by the cached skill matrix
+# (users/recommend.py); the only query loads the top-k users.
+# -------------------------
+class RecommendedUsersView(ReadOnlyDatabaseMixin, APIView):
+    permission_classes = (IsAuthenticated,)
+    max_k = 50
+
+    def get(self, request):
+        user = request.user
+        try:
+            k = min(max(int(request.query_params.get('k', 20)), 1), self.max_k)
+        except ValueError:
+            k = 20
+        want = [x for x in request.query_params.get('want', '').split(',') if x.strip()]
+
+        ranked = skill_matrix().recommend(
+            user.id, user.skills, user.languages, want=want, k=k,
+            exclude=friend_graph().friends(user.id),
+        )
+        users = User.objects.filter(is_active=True).in_bulk([uid for uid, _ in ranked])
+        data = []
+        for uid, score in ranked:
+            if uid in users:
+                row = dict(UserSerializer(users[uid]).data)
+                row['score'] = round(score, 4)
+                data.append(row)
+        return Response(data, status=status.HTTP_200_OK)
+
+
 # append to backend/users/views.py
 
 from rest_framework import generics, permissions, status
@@ -186,8 +265,11 @@ from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
 from django.db import IntegrityError, transaction
 from django.conf import settings
-from .models import FriendRequest, Friendship, Notification
-from .serializers import FriendRequestSerializer, FriendshipSerializer, NotificationSerializer
+from .models import FriendRequest, Friendship, Notification, Message
+from .serializers import FriendRequestSerializer, MessageSerializer, mini_profile
+from .graph import friend_graph
+from . import bulk, outbox
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -216,68 +298,98 @@ class SendFriendRequestView(APIView):
         # if reverse pending request exists -> accept it automatically
         reverse = FriendRequest.objects.filter(from_user=to_user, to_user=request.user, status=FriendRequest.STATUS_PENDING).first()
         if reverse:
-            # accept reverse request
+            # accept reverse request (same conditional update as AcceptFriendRequestView)
             with transaction.atomic():
-                reverse.status = FriendRequest.STATUS_ACCEPTED
-                reverse.save()
-                u1, u2 = _make_friendship(request.user, to_user)
-                Friendship.objects.get_or_create(user1=u1, user2=u2)
-                # create notifications
-                Notification.objects.create(user=to_user, actor_user=request.user, type=Notification.NOTIF_FRIEND_ACCEPT, text=f"{request.user.get_username()} accepted your request")
-                Notification.objects.create(user=request.user, actor_user=to_user, type=Notification.NOTIF_FRIEND_ACCEPT, text=f"You are now friends with {to_user.get_username()}")
+                if _set_status(reverse.id, FriendRequest.STATUS_ACCEPTED, to_user_id=request.user.id):
+                    _befriend(to_user.id, to_user.get_username(), request.user, request_id=reverse.id)
             return Response({"detail":"mutual request accepted"}, status=status.HTTP_200_OK)
 
         # normal create pending request (prevent duplicates)
         try:
-            fr, created = FriendRequest.objects.get_or_create(from_user=request.user, to_user=to_user)
-            if not created:
-                if fr.status == FriendRequest.STATUS_PENDING:
-                    return Response({"detail":"request already pending"}, status=status.HTTP_400_BAD_REQUEST)
-                # if previously rejected/cancelled, recreate
-                fr.status = FriendRequest.STATUS_PENDING
-                fr.save()
-            # create notification for receiver
-            Notification.objects.create(user=to_user, actor_user=request.user, type=Notification.NOTIF_FRIEND_REQUEST, text=f"{request.user.get_username()} sent you a connection request", data={"request_id": fr.id})
+            with transaction.atomic():
+                fr, created = FriendRequest.objects.get_or_create(from_user=request.user, to_user=to_user)
+                if not created:
+                    if fr.status == FriendRequest.STATUS_PENDING:
+                        return Response({"detail":"request already pending"}, status=status.HTTP_400_BAD_REQUEST)
+                    # if previously rejected/cancelled, recreate
+                    fr.status = FriendRequest.STATUS_PENDING
+                    fr.save()
+                # notification for receiver (created by the outbox worker)
+                outbox.enqueue_notifications(dict(user_id=to_user.id, actor_user_id=request.user.id, type=Notification.NOTIF_FRIEND_REQUEST, text=f"{request.user.get_username()} sent you a connection request", data={"request_id": fr.id}))
         except IntegrityError:
             return Response({"detail":"duplicate request"}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(FriendRequestSerializer(fr).data, status=status.HTTP_201_CREATED)
 
 
-class ReceivedFriendRequestsView(generics.ListAPIView):
+# The polled lists answer If-None-Match / If-Modified-Since with 304 from one
+# aggregate query (users/conditional.py). Status changes bump updated_at.
+class ReceivedFriendRequestsView(ReadOnlyDatabaseMixin, ConditionalGetMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = FriendRequestSerializer
 
     def get_queryset(self):
-        return FriendRequest.objects.filter(to_user=self.request.user).order_by('-created_at')
+        return (FriendRequest.objects.filter(to_user=self.request.user)
+                .order_by('-created_at'))
 
+    def get_version(self, request):
+        return aggregate_stamp(self.get_queryset(), 'updated_at')
 
-class SentFriendRequestsView(generics.ListAPIView):
+
+class SentFriendRequestsView(ReadOnlyDatabaseMixin, ConditionalGetMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = FriendRequestSerializer
 
     def get_queryset(self):
-        return FriendRequest.objects.filter(from_user=self.request.user).order_by('-created_at')
+        return (FriendRequest.objects.filter(from_user=self.request.user)
+                .order_by('-created_at'))
+
+    def get_version(self, request):
+        return aggregate_stamp(self.get_queryset(), 'updated_at')
+
+
+# Accept / reject / cancel are single conditional UPDATEs
+# (... WHERE id=? AND to_user_id=? AND status='pending'): the row count says
+# whether this request won, so two concurrent accepts can't both succeed.
+def _transition_refused(pk, user_field, user, not_pending="request not pending"):
+    """Response for a transition whose UPDATE matched no row."""
+    row = FriendRequest.objects.filter(id=pk).values(user_field, 'status').first()
+    if row is None:
+        return Response({"detail":"Not found."}, status=status.HTTP_404_NOT_FOUND)
+    if row[user_field] != user.id:
+        return Response({"detail":"not allowed"}, status=status.HTTP_403_FORBIDDEN)
+    return Response({"detail":not_pending}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _set_status(pk, status_value, **match):
+    return (FriendRequest.objects.filter(id=pk, status=FriendRequest.STATUS_PENDING, **match)
+            .update(status=status_value, updated_at=timezone.now()))
+
+
+def _befriend(from_id, from_name, to_user, request_id=None):
+    """Friendship + one outbox job for both 'accepted' notifications.
+    Call inside the transaction that accepted the request."""
+    a, b = sorted((from_id, to_user.id))
+    friendship = Friendship(user1_id=a, user2_id=b)
+    Friendship.objects.bulk_create([friendship], ignore_conflicts=True)
+    bulk.friendships_created([friendship])  # bulk_create skips post_save
+    data = {"request_id": request_id} if request_id else None
+    outbox.enqueue_notifications(
+        dict(user_id=from_id, actor_user_id=to_user.id, type=Notification.NOTIF_FRIEND_ACCEPT, text=f"{to_user.get_username()} accepted your request", data=data),
+        dict(user_id=to_user.id, actor_user_id=from_id, type=Notification.NOTIF_FRIEND_ACCEPT, text=f"You are now friends with {from_name}", data=data),
+    )
 
 
 class AcceptFriendRequestView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def post(self, request, pk):
-        fr = get_object_or_404(FriendRequest, id=pk)
-        if fr.to_user.id != request.user.id:
-            return Response({"detail":"not allowed"}, status=status.HTTP_403_FORBIDDEN)
-        if fr.status != FriendRequest.STATUS_PENDING:
-            return Response({"detail":"request not pending"}, status=status.HTTP_400_BAD_REQUEST)
-
         with transaction.atomic():
-            fr.status = FriendRequest.STATUS_ACCEPTED
-            fr.save()
-            u1, u2 = _make_friendship(fr.from_user, fr.to_user)
-            Friendship.objects.get_or_create(user1=u1, user2=u2)
-            # notifications
-            Notification.objects.create(user=fr.from_user, actor_user=fr.to_user, type=Notification.NOTIF_FRIEND_ACCEPT, text=f"{fr.to_user.get_username()} accepted your request", data={"request_id": fr.id})
-            Notification.objects.create(user=fr.to_user, actor_user=fr.from_user, type=Notification.NOTIF_FRIEND_ACCEPT, text=f"You are now friends with {fr.from_user.get_username()}", data={"request_id": fr.id})
+            if not _set_status(pk, FriendRequest.STATUS_ACCEPTED, to_user_id=request.user.id):
+                return _transition_refused(pk, 'to_user_id', request.user)
+            from_id, from_name = (FriendRequest.objects.filter(id=pk)
+                                  .values_list('from_user_id', 'from_user__username').get())
+            _befriend(from_id, from_name, request.user, request_id=pk)
         return Response({"detail":"accepted"}, status=status.HTTP_200_OK)
 
 
@@ -285,14 +397,11 @@ class RejectFriendRequestView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def post(self, request, pk):
-        fr = get_object_or_404(FriendRequest, id=pk)
-        if fr.to_user.id != request.user.id:
-            return Response({"detail":"not allowed"}, status=status.HTTP_403_FORBIDDEN)
-        if fr.status != FriendRequest.STATUS_PENDING:
-            return Response({"detail":"request not pending"}, status=status.HTTP_400_BAD_REQUEST)
-        fr.status = FriendRequest.STATUS_REJECTED
-        fr.save()
-        Notification.objects.create(user=fr.from_user, actor_user=fr.to_user, type=Notification.NOTIF_SYSTEM, text=f"{fr.to_user.get_username()} rejected your connection request", data={"request_id": fr.id})
+        with transaction.atomic():
+            if not _set_status(pk, FriendRequest.STATUS_REJECTED, to_user_id=request.user.id):
+                return _transition_refused(pk, 'to_user_id', request.user)
+            from_id = FriendRequest.objects.filter(id=pk).values_list('from_user_id', flat=True).get()
+            outbox.enqueue_notifications(dict(user_id=from_id, actor_user_id=request.user.id, type=Notification.NOTIF_SYSTEM, text=f"{request.user.get_username()} rejected your connection request", data={"request_id": pk}))
         return Response({"detail":"rejected"}, status=status.HTTP_200_OK)
 
 
@@ -300,46 +409,419 @@ class CancelFriendRequestView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def delete(self, request, pk):
-        fr = get_object_or_404(FriendRequest, id=pk)
-        if fr.from_user.id != request.user.id:
-            return Response({"detail":"not allowed"}, status=status.HTTP_403_FORBIDDEN)
-        if fr.status != FriendRequest.STATUS_PENDING:
-            return Response({"detail":"cannot cancel"}, status=status.HTTP_400_BAD_REQUEST)
-        fr.status = FriendRequest.STATUS_CANCELLED
-        fr.save()
+        if not _set_status(pk, FriendRequest.STATUS_CANCELLED, from_user_id=request.user.id):
+            return _transition_refused(pk, 'from_user_id', request.user, not_pending="cannot cancel")
         return Response({"detail":"cancelled"}, status=status.HTTP_200_OK)
 
 
-class FriendsListView(generics.ListAPIView):
+class FriendsListView(ReadOnlyDatabaseMixin, ConditionalGetMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
-    serializer_class = FriendshipSerializer
+    serializer_class = FriendshipReadSerializer
 
-    def get_queryset(self):
-        user = self.request.user
+    @staticmethod
+    def friendships(user):
         # friendships where user is user1 or user2
-        return Friendship.objects.filter(models.Q(user1=user) | models.Q(user2=user)).order_by('-created_at')
+        return (Friendship.objects.filter(models.Q(user1=user) | models.Q(user2=user))
+                .order_by('-created_at'))
+
+    def get_queryset(self):
+        return self.friendships(self.request.user)
+
+    def get_version(self, request):
+        return aggregate_stamp(self.get_queryset(), 'created_at')
+
+
+# GET /api/friends/suggestions/?limit=10  -> people you may know
+# Ranked by mutual friends, answered from the in-memory graph (users/graph.py);
+# the only query hydrates the returned page of users.
+class FriendSuggestionsView(ReadOnlyDatabaseMixin, APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+        # ask for a few extra in case some candidates are inactive
+        ranked = friend_graph().suggestions(request.user.id, limit=limit + 5)
+        users = User.objects.filter(id__in=[uid for uid, _ in ranked], is_active=True) \
+            .only('id', 'full_name', 'avatar_url').in_bulk()
+        data = []
+        for uid, mutual in ranked:
+            if uid in users and len(data) < limit:
+                data.append({**mini_profile(users[uid]), "mutual_count": mutual})
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# GET /api/friends/mutual/?ids=4,8,15  -> {"4": 2, "8": 0, "15": 1}
+# Mutual-friend counts for feed cards, no SQL.
+class MutualFriendsView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    max_ids = 100
+
+    def get(self, request):
+        try:
+            ids = [int(x) for x in request.query_params.get('ids', '').split(',') if x.strip()]
+        except ValueError:
+            return Response({"detail":"ids must be comma-separated integers"}, status=status.HTTP_400_BAD_REQUEST)
+        counts = friend_graph().mutual_counts(request.user.id, ids[:self.max_ids])
+        return Response({str(k): v for k, v in counts.items()}, status=status.HTTP_200_OK)
 
 
 # Notifications
-class NotificationsListView(generics.ListAPIView):
+class NotificationsListView(ReadOnlyDatabaseMixin, ConditionalGetMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
-    serializer_class = NotificationSerializer
+    serializer_class = NotificationReadSerializer
+    limit = 50  # newest first
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')[:50]
+        return (Notification.objects.filter(user=self.request.user)
+                .order_by('-created_at')[:self.limit])
+
+    def get_version(self, request):
+        # mark-read doesn't touch created_at, so the unread count is part of the stamp
+        return aggregate_stamp(Notification.objects.filter(user=request.user), 'created_at',
+                               unread=models.Count('id', filter=models.Q(is_read=False)))
 
 
 class MarkNotificationReadView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def post(self, request, pk):
-        notif = get_object_or_404(Notification, id=pk, user=request.user)
-        notif.is_read = True
-        notif.save()
+        # conditional update so only a real unread -> read flip touches the counter
+        with transaction.atomic():
+            changed = Notification.objects.filter(id=pk, user=request.user, is_read=False).update(is_read=True, updated_at=timezone.now())
+            if changed:
+                add_unread(request.user.id, -changed)
+        if not changed and not Notification.objects.filter(id=pk, user=request.user).exists():
+            return Response({"detail":"Not found."}, status=status.HTTP_404_NOT_FOUND)
         return Response({"detail":"marked"}, status=status.HTTP_200_OK)
 
 
+# POST /api/notifications/mark-read/
+#   {"ids": [1, 2, 3]}   -> mark those notifications read
+#   {"up_to_id": 120}    -> mark everything with id <= 120 read (older than a cursor)
+# Either way one conditional UPDATE; returns {"updated": <rows changed>}.
+class MarkNotificationsReadView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    max_ids = 500
+
+    def post(self, request):
+        qs = Notification.objects.filter(user=request.user, is_read=False)
+        ids = request.data.get('ids')
+        up_to_id = request.data.get('up_to_id')
+        try:
+            if ids is not None:
+                if not isinstance(ids, list) or len(ids) > self.max_ids:
+                    raise ValueError
+                qs = qs.filter(id__in=[int(x) for x in ids])
+            elif up_to_id is not None:
+                qs = qs.filter(id__lte=int(up_to_id))
+            else:
+                return Response({"detail":"ids or up_to_id required"}, status=status.HTTP_400_BAD_REQUEST)
+        except (TypeError, ValueError):
+            return Response({"detail":f"ids must be a list of at most {self.max_ids} ids; up_to_id an id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            updated = qs.update(is_read=True, updated_at=timezone.now())
+            if updated:
+                add_unread(request.user.id, -updated)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
+# POST /api/notifications/mark-all-read/  -> {"updated": <rows changed>}
+class MarkAllNotificationsReadView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        with transaction.atomic():
+            updated = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True, updated_at=timezone.now())
+            reset_unread(request.user.id)
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
+# GET /api/notifications/unread-count/  -> {"unread": n} for the badge
+class UnreadNotificationCountView(ReadOnlyDatabaseMixin, APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        return Response({"unread": get_unread(request.user.id)}, status=status.HTTP_200_OK)
+
+
+# -------------------------
+# Chat
+# GET  /api/chat/<user_id>/?before=<message_id>&limit=30
+#      -> one page of history, oldest first; pass the first id as `before`
+#         to load the page above it (keyset on the (conversation, id) index)
+# POST /api/chat/<user_id>/send/  {"message": "..."}
+# Both answer 403 unless the two users are friends.
+# -------------------------
+def _are_friends(user, other):
+    a, b = _make_friendship(user, other)
+    return Friendship.objects.filter(user1=a, user2=b).exists()
+
+
+class ChatHistoryView(ReadOnlyDatabaseMixin, APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    default_limit = 30
+    max_limit = 100
+
+    def get(self, request, user_id):
+        other = get_object_or_404(User.objects.only('id', 'full_name', 'username'), id=user_id)
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+        except ValueError:
+            return Response({"detail":"before/limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not _are_friends(request.user, other):
+            return Response({"detail":"you can only chat with friends"}, status=status.HTTP_403_FORBIDDEN)
+
+        qs = Message.objects.filter(conversation=Message.conversation_key(request.user.id, other.id))
+        if before is not None:
+            qs = qs.filter(id__lt=before)
+        page = list(qs.order_by('-id')[:limit])
+        page.reverse()
+
+        names = {
+            request.user.id: request.user.full_name or request.user.get_username(),
+            other.id: other.full_name or other.get_username(),
+        }
+        return Response(MessageSerializer(page, many=True, context={"names": names}).data, status=status.HTTP_200_OK)
+
+
+class ChatSendView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    max_length = 2000
+
+    def post(self, request, user_id):
+        text = (request.data.get('message') or '').strip()
+        if not text:
+            return Response({"detail":"message required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(text) > self.max_length:
+            return Response({"detail":f"message too long (max {self.max_length} characters)"}, status=status.HTTP_400_BAD_REQUEST)
+        if int(user_id) == request.user.id:
+            return Response({"detail":"cannot message yourself"}, status=status.HTTP_400_BAD_REQUEST)
+        to_user = get_object_or_404(User.objects.only('id', 'full_name', 'username'), id=user_id, is_active=True)
+        if not _are_friends(request.user, to_user):
+            return Response({"detail":"you can only chat with friends"}, status=status.HTTP_403_FORBIDDEN)
+
+        with transaction.atomic():
+            msg = Message.objects.create(
+                conversation=Message.conversation_key(request.user.id, to_user.id),
+                sender=request.user, recipient=to_user, text=text,
+            )
+            outbox.enqueue_notifications(dict(user_id=to_user.id, actor_user_id=request.user.id, type=Notification.NOTIF_MESSAGE, text=f"{request.user.get_username()} sent you a message", data={"message_id": msg.id, "from": request.user.id}))
+
+        names = {request.user.id: request.user.full_name or request.user.get_username()}
+        return Response(MessageSerializer(msg, context={"names": names}).data, status=status.HTTP_201_CREATED)
+
+
+# -------------------------
+# GET /api/metrics/  -> per-route request timings in Prometheus text format
+# (recorded by users.middleware.PerformanceMiddleware). Staff only; accepts a
+# staff JWT (for the scraper) or an admin session (for a browser).
+# -------------------------
+from django.http import HttpResponse
+from rest_framework.authentication import SessionAuthentication
+from .authentication import CachedJWTAuthentication
+from .metrics import registry as metrics_registry
+
+
+class MetricsView(APIView):
+    authentication_classes = (CachedJWTAuthentication, SessionAuthentication)
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(metrics_registry.to_prometheus(),
+                            content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
+# -------------------------
+# POST /api/auth/signup/batch/  -> create many users at once (staff only)
+# Body: a JSON list of SignupView payloads (or {"users": [...]}), or
+# application/x-ndjson with one payload per line, read as a stream.
+# Same validation as SignupView; see users/bulk_signup.py.
+# -------------------------
+import json as _json
+from .bulk_signup import import_users
+from .password_pool import shared_hash_pool
+
 
+class BatchSignupView(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+    max_rows = 5000
+    chunk_size = 500
+
+    def post(self, request):
+        if request.content_type.startswith('application/x-ndjson'):
+            rows = self._ndjson_rows(request.stream)
+        else:
+            rows = request.data.get('users') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                return Response({"detail":"expected a list of users"}, status=status.HTTP_400_BAD_REQUEST)
+            if len(rows) > self.max_rows:
+                return Response({"detail":f"at most {self.max_rows} users per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        created, errors = [], []
+        for result in import_users(rows, chunk_size=self.chunk_size, executor=shared_hash_pool()):
+            (created if 'id' in result else errors).append(result)
+        code = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "errors": errors}, status=code)
+
+    def _ndjson_rows(self, stream):
+        if stream is None:
+            return
+        for n, line in enumerate(stream, 1):
+            if n > self.max_rows:
+                yield ValueError(f"at most {self.max_rows} users per request")
+                return
+            if not line.strip():
+                continue
+            try:
+                yield _json.loads(line)
+            except ValueError as exc:
+                yield ValueError(f"invalid JSON: {exc}")
+
+
+# -------------------------
+# GET /api/export/<kind>/?format=ndjson|csv&after_id=&updated_since=
+# kind: users | friendships | friend_requests | notifications (staff only)
+# Streams every row in id order without building the list in memory; for an
+# incremental pull pass the largest id already received as after_id, or the
+# time of the last pull as updated_since to also get rows edited since then.
+# -------------------------
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+from .export import EXPORTS, CONTENT_TYPES, astream, stream_export
+from .renderers import NDJSONRenderer, CSVRenderer
+
+
+class ExportView(APIView):
+    authentication_classes = (CachedJWTAuthentication, SessionAuthentication)
+    permission_classes = (permissions.IsAdminUser,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, kind):
+        if kind not in EXPORTS:
+            return Response({"detail":f"unknown export; one of {', '.join(EXPORTS)}"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            after_id = self._int_param('after_id')
+            updated_since = self._since_param()
+        except ValueError as exc:
+            return Response({"detail":str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.accepted_renderer.format
+        chunks = stream_export(kind, fmt, after_id=after_id, updated_since=updated_since)
+        if isinstance(request._request, ASGIRequest):
+            chunks = astream(chunks)
+        response = StreamingHttpResponse(chunks, content_type=f'{CONTENT_TYPES[fmt]}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def _int_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+
+    def _since_param(self):
+        value = self.request.query_params.get('updated_since')
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None and parse_date(value) is not None:
+            since = parse_datetime(f'{value}T00:00:00')  # a bare date means midnight
+        if since is None:
+            raise ValueError("updated_since must be an ISO date or datetime")
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+
+# -------------------------
+# GET /api/bootstrap/?seed=  -> everything home.html needs on first paint
+# {"me", "feed": {"seed", "next", "results"}, "friends", "friends_count",
+#  "requests": {"received", "sent"}, "notifications"}
+#
+# Same payloads as /api/me/, /api/users/, /api/friends/, the pending entries
+# of /api/friends/requests/{received,sent}/ and /api/notifications/ (built by
+# the same read serializers), in one round trip. Each list is capped: friends
+# and requests at their newest `list_limit` rows (the full lists are at their
+# own endpoints), notifications at NotificationsListView.limit, the feed at
+# one page. The sections share one prefetch pass: their mini-profiles come
+# from a single cache lookup, and the feed's `relationship` field is worked
+# out from the friendships / requests already loaded instead of querying
+# again when those lists are complete.
+# -------------------------
+from django.urls import reverse
+from .pagination import SeededFeedPagination
+from .profile_cache import get_mini_profiles
+from . import relationships
+
+
+class BootstrapView(ReadOnlyDatabaseMixin, APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    list_limit = 100
+
+    def get(self, request):
+        user = request.user
+        limit = self.list_limit
+        friends = FriendsListView.friendships(user)
+        friendships = list(FriendshipReadSerializer.values(friends[:limit]))
+        friends_count = len(friendships) if len(friendships) < limit else friends.count()
+        pending = FriendRequest.objects.filter(status=FriendRequest.STATUS_PENDING).order_by('-created_at')
+        received = list(pending.filter(to_user=user)[:limit])
+        sent = list(pending.filter(from_user=user)[:limit])
+        notifs = list(NotificationReadSerializer.values(
+            Notification.objects.filter(user=user).order_by('-created_at')[:NotificationsListView.limit]))
+
+        paginator = SeededFeedPagination()
+        paginator.base_url = request.build_absolute_uri(reverse('api-users'))
+        feed = paginator.paginate_queryset(
+            FeedUserReadSerializer.values(User.objects.filter(is_active=True), 'feed_key', named=True),
+            request, view=self)
+
+        complete = friends_count == len(friendships) and len(received) < limit and len(sent) < limit
+        context = self.prefetch(user, friendships, received + sent, notifs, feed, complete)
+        me = dict(UserSerializer(user).data)
+        me['unread_notifications'] = get_unread(user.id)
+        return Response({
+            "me": me,
+            "feed": {
+                "seed": paginator.seed,
+                "next": paginator.get_next_link(),
+                "results": FeedUserReadSerializer(feed, many=True, context=context).data,
+            },
+            "friends": FriendshipReadSerializer(friendships, many=True, context=context).data,
+            "friends_count": friends_count,
+            "requests": {
+                "received": FriendRequestSerializer(received, many=True, context=context).data,
+                "sent": FriendRequestSerializer(sent, many=True, context=context).data,
+            },
+            "notifications": NotificationReadSerializer(notifs, many=True, context=context).data,
+        })
 
+    def prefetch(self, user, friendships, requests, notifs, feed, complete):
+        context = {'request': self.request, 'view': self}
+        wanted = {b if a == user.id else a for _, a, b, _ in friendships}
+        wanted.update(actor_id for *_, actor_id, _ in notifs if actor_id is not None)
+        child = FriendRequestSerializer(context=context)
+        for row in requests:
+            wanted.update(child.profile_ids(row))
+        context['profiles'] = get_mini_profiles(wanted)
+        if complete:
+            # otherwise FeedUserReadSerializer looks the page up itself
+            context['relationships'] = relationships.resolve(
+                user.id, [row.id for row in feed],
+                [(a, b) for _, a, b, _ in friendships],
+                [(r.from_user_id, r.to_user_id) for r in requests],
+            )
+        return context